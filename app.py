@@ -1,26 +1,131 @@
+import functools
 import os
-# import sys
 
-# Impor library dengan penanganan yang lebih aman
-try:
-    import pickle
+import streamlit as st
+
+# Render grafik di thread pool agar rincian teks ditampilkan tanpa menunggu grafik
+RENDER_DI_LATAR = True
+
+# Label tampilan untuk setiap fitur model
+LABEL_FITUR = {
+    'land_size_m2': 'Luas Tanah',
+    'building_size_m2': 'Luas Bangunan',
+    'bedrooms': 'Jumlah Kamar'
+}
+SATUAN_FITUR = {
+    'land_size_m2': ' m²',
+    'building_size_m2': ' m²',
+    'bedrooms': ''
+}
+
+def muat_pipeline():
+    """
+    Memuat pipeline model terlatih
+
+    Loader sudah menyimpan pipeline di registry dan memuat ulang bila file
+    artefak berubah, sehingga model hasil training ulang langsung dipakai
+    tanpa restart Streamlit.
+    """
+    # Pipeline ringan hanya membutuhkan NumPy; pandas/sklearn dimuat hanya
+    # bila artefak ringan tidak tersedia
+    from src.slim_inference import load_slim_pipeline, slim_pipeline_path
+    if slim_pipeline_path() is not None:
+        return load_slim_pipeline()
+
+    from prediction import load_pipeline
+    return load_pipeline()
+
+@st.cache_resource(max_entries=2)
+def muat_tabel_prediksi(versi, _pipeline):
+    """
+    Menghitung tabel prediksi sekali per versi model
+
+    Argumen _pipeline tidak ikut di-hash oleh Streamlit; kunci cache adalah versi.
+    """
+    from src.prediction_grid import PredictionGrid
+    return PredictionGrid.build(_pipeline)
+
+def prediksi_dengan_kontribusi(pipeline, nilai_input, tabel=None):
+    """
+    Memprediksi harga dan kontribusi setiap fitur
+
+    Kontribusi fitur adalah selisih prediksi dibanding bila fitur tersebut
+    diganti nilai median data latih. Semua baris diprediksi dalam satu panggilan,
+    dari tabel prediksi bila tersedia dan input berada di dalam grid.
+    """
     import numpy as np
-    import streamlit as st
-    import pandas as pd
-    
-    # Tambahkan backend non-interaktif untuk matplotlib
-    import matplotlib
-    matplotlib.use('Agg')
-    
-    import matplotlib.pyplot as plt
-    import seaborn as sns
-    from sklearn.linear_model import LinearRegression
-    from sklearn.preprocessing import StandardScaler
-    from sklearn.impute import SimpleImputer
-except ImportError as e:
-    st.error(f"Error importing module: {e}")
-    st.error("Pastikan semua library sudah terinstal.")
-    st.stop()
+
+    indeks = [pipeline.feature_names.index(nama) for nama in nilai_input]
+
+    # Fitur yang tidak diisi pengguna memakai nilai median
+    x = pipeline.fill_values.copy()
+    x[indeks] = list(nilai_input.values())
+
+    baris = np.tile(x, (len(indeks) + 1, 1))
+    for j, i in enumerate(indeks):
+        baris[j + 1, i] = pipeline.fill_values[i]
+
+    if tabel is not None:
+        prediksi, dari_tabel = tabel.predict(baris, pipeline)
+        dari_tabel = bool(dari_tabel.all())
+    else:
+        prediksi, dari_tabel = pipeline.predict(baris), False
+    return prediksi[0], prediksi[0] - prediksi[1:], dari_tabel
+
+@st.cache_resource
+def eksekutor_grafik():
+    """
+    Thread pool untuk merender grafik di luar thread skrip Streamlit
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix='grafik')
+
+@functools.lru_cache(maxsize=256)
+def render_grafik_kontribusi(label, kontribusi_persen):
+    """
+    Merender grafik batang kontribusi faktor menjadi PNG
+
+    Memakai Figure berorientasi objek (tanpa state global pyplot) sehingga
+    aman dipanggil bersamaan dari beberapa sesi. Hasil di-cache per
+    pasangan (label, persentase) yang sama.
+    """
+    import io
+
+    # Matplotlib hanya dimuat saat grafik pertama kali dibuat
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    ax.bar(label, kontribusi_persen, color=['blue', 'green', 'red'])
+    ax.set_title('Kontribusi Faktor terhadap Harga Rumah')
+    ax.set_xlabel('Faktor')
+    ax.set_ylabel('Kontribusi (%)')
+    ax.set_ylim(-100, 100)
+    ax.axhline(0, color='black', linewidth=0.8)
+
+    # Tambahkan label persentase
+    for i, v in enumerate(kontribusi_persen):
+        ax.text(i, v, f'{v:.1f}%', ha='center', va='bottom' if v >= 0 else 'top')
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+def mulai_grafik_kontribusi(label, kontribusi_persen):
+    """
+    Mulai merender grafik; mengembalikan Future berisi PNG
+
+    Persentase dibulatkan ke 0.1% (presisi label grafik) agar input yang
+    hampir sama memakai grafik dari cache.
+    """
+    argumen = (tuple(label), tuple(round(float(k), 1) for k in kontribusi_persen))
+    if RENDER_DI_LATAR:
+        return eksekutor_grafik().submit(render_grafik_kontribusi, *argumen)
+
+    from concurrent.futures import Future
+    future = Future()
+    future.set_result(render_grafik_kontribusi(*argumen))
+    return future
 
 def main():
     st.title("🏘️ Prediksi Harga Rumah Jabodetabek")
@@ -42,71 +147,65 @@ def main():
     luas_bangunan = st.number_input("Luas Bangunan (m²)", min_value=0, value=100)
     jumlah_kamar = st.number_input("Jumlah Kamar", min_value=0, value=2)
 
-    def prediksi_harga_sederhana(luas_tanah, luas_bangunan, jumlah_kamar):
-        """
-        Fungsi prediksi harga sederhana
-        """
-        # Faktor konstanta
-        harga_per_m2_tanah = 5_000_000  # Rp 5 juta per m2
-        harga_per_m2_bangunan = 10_000_000  # Rp 10 juta per m2
-        harga_per_kamar = 50_000_000  # Rp 50 juta per kamar
-
-        # Hitung prediksi
-        prediksi = (
-            (luas_tanah * harga_per_m2_tanah) + 
-            (luas_bangunan * harga_per_m2_bangunan) + 
-            (jumlah_kamar * harga_per_kamar)
-        )
-        
-        return prediksi
+    # Mode cepat: prediksi dari tabel grid yang dihitung sekali per versi model
+    pakai_tabel = st.sidebar.checkbox(
+        "Mode cepat (tabel prediksi)", value=False,
+        help="Prediksi diambil dari tabel yang dihitung sebelumnya untuk setiap "
+             "input bulat (luas hingga 500 m²); input lain tetap memakai model."
+    )
 
     if st.button("Prediksi Harga"):
         try:
+            pipeline = muat_pipeline()
+        except FileNotFoundError:
+            st.error("File model tidak ditemukan. Jalankan train_model.py terlebih dahulu.")
+            return
+
+        try:
+            nilai_input = {
+                'land_size_m2': luas_tanah,
+                'building_size_m2': luas_bangunan,
+                'bedrooms': jumlah_kamar
+            }
+
+            tabel = None
+            if pakai_tabel:
+                with st.spinner("Menyiapkan tabel prediksi..."):
+                    tabel = muat_tabel_prediksi(pipeline.version, pipeline)
+
             # Lakukan prediksi
-            predicted_price = prediksi_harga_sederhana(
-                luas_tanah, 
-                luas_bangunan, 
-                jumlah_kamar
+            predicted_price, kontribusi, dari_tabel = prediksi_dengan_kontribusi(
+                pipeline, nilai_input, tabel
             )
-            
+
             # Tampilkan hasil prediksi
             st.success(f"Estimasi Harga Rumah: Rp {predicted_price:,.2f}")
-            
+            if pakai_tabel:
+                st.caption("Sumber: tabel prediksi" if dari_tabel
+                           else "Sumber: model (input di luar grid tabel)")
+
             # Visualisasi kontribusi
             st.subheader("📊 Kontribusi Faktor Harga")
-            
-            # Hitung persentase kontribusi
-            total = predicted_price
-            kontribusi = [
-                (luas_tanah * 5_000_000 / total) * 100,
-                (luas_bangunan * 10_000_000 / total) * 100,
-                (jumlah_kamar * 50_000_000 / total) * 100
-            ]
-            
-            # Buat plot
-            plt.figure(figsize=(10, 6))
-            plt.bar(
-                ['Luas Tanah', 'Luas Bangunan', 'Jumlah Kamar'], 
-                kontribusi, 
-                color=['blue', 'green', 'red']
-            )
-            plt.title('Kontribusi Faktor terhadap Harga Rumah')
-            plt.xlabel('Faktor')
-            plt.ylabel('Kontribusi (%)')
-            plt.ylim(0, 100)
-            
-            # Tambahkan label persentase
-            for i, v in enumerate(kontribusi):
-                plt.text(i, v, f'{v:.1f}%', ha='center', va='bottom')
-            
-            st.pyplot(plt)
-            plt.close()
+
+            # Hitung persentase kontribusi terhadap total perubahan
+            total = sum(abs(k) for k in kontribusi) or 1
+            kontribusi_persen = [k / total * 100 for k in kontribusi]
+            label = [LABEL_FITUR[nama] for nama in nilai_input]
+            grafik = mulai_grafik_kontribusi(label, kontribusi_persen)
+            slot_grafik = st.empty()
 
             # Rincian detail
             st.subheader("📝 Rincian Perhitungan")
-            st.write(f"**Luas Tanah:** {luas_tanah} m² (Rp {luas_tanah * 5_000_000:,})")
-            st.write(f"**Luas Bangunan:** {luas_bangunan} m² (Rp {luas_bangunan * 10_000_000:,})")
-            st.write(f"**Jumlah Kamar:** {jumlah_kamar} (Rp {jumlah_kamar * 50_000_000:,})")
+            for nama, k in zip(nilai_input, kontribusi):
+                median = pipeline.fill_values[pipeline.feature_names.index(nama)]
+                satuan = SATUAN_FITUR[nama]
+                st.write(
+                    f"**{LABEL_FITUR[nama]}:** {nilai_input[nama]}{satuan} "
+                    f"(Rp {k:+,.0f} dibanding median {median:g}{satuan})"
+                )
+
+            # Grafik diisi ke tempatnya setelah selesai dirender
+            slot_grafik.image(grafik.result())
 
         except Exception as e:
             st.error(f"Terjadi kesalahan dalam prediksi: {e}")
@@ -0,0 +1,271 @@
+"""Benchmark suite for the training and inference hot paths
+
+Runs each benchmark on synthetic copies of jabodetabek_house_price.csv
+scaled 1x/10x/100x, stores the timings as JSON under benchmarks/results/
+and compares them with a previous run:
+
+    python benchmark.py --scales 1 10
+    python benchmark.py --scales 1 10 100 --models random_forest hist_gradient_boosting
+    python benchmark.py --compare benchmarks/results/<previous>.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import StandardScaler
+
+import prediction
+from src.dataset_cache import load_dataset, source_hash
+from src.feature_engineering import FeatureEngineer
+from src.flat_forest import CompactForest, FlatForest
+from src.inference import InferencePipeline
+from src.model_training import ModelTrainer
+from src.slim_inference import SlimPipeline
+
+SOURCE_PATH = os.path.join('app', 'jabodetabek_house_price.csv')
+DATA_DIR = os.path.join('benchmarks', 'data')
+RESULTS_DIR = os.path.join('benchmarks', 'results')
+FEATURES = ['land_size_m2', 'building_size_m2', 'bedrooms']
+TARGET = 'price_in_rp'
+DEFAULT_MODELS = ['random_forest', 'hist_gradient_boosting', 'linear_regression', 'sgd']
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Timed in a fresh interpreter: import of the entry point, then one prediction
+STARTUP_SCRIPT = """
+import json, time
+start = time.perf_counter()
+{imports}
+imported = time.perf_counter()
+{call}({{'land_size_m2': 100, 'building_size_m2': 50, 'bedrooms': 3}}, {model_dir!r})
+done = time.perf_counter()
+print(json.dumps({{'import_s': imported - start, 'first_prediction_s': done - imported}}))
+"""
+STARTUP_ENTRY_POINTS = {
+    'startup_prediction': ('from prediction import make_prediction', 'make_prediction'),
+    'startup_slim': ('from src.slim_inference import predict', 'predict')
+}
+
+def make_synthetic(source_path, scale, seed=42):
+    """Write a synthetic dataset with `scale` times the rows of the source CSV"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    # Keyed on the source content and seed so a changed source is rebuilt
+    name = f'synthetic_{scale}x-{source_hash(source_path, DATA_DIR)}-seed{seed}.csv'
+    path = os.path.join(DATA_DIR, name)
+    if os.path.exists(path):
+        return path
+
+    df = pd.read_csv(source_path)
+    rng = np.random.default_rng(seed)
+    sample = df.iloc[rng.integers(0, len(df), len(df) * scale)].reset_index(drop=True)
+
+    # Jitter sizes and prices so resampled rows are not exact duplicates
+    for column in ['land_size_m2', 'building_size_m2', TARGET]:
+        noise = rng.normal(1.0, 0.05, len(sample))
+        sample[column] = (sample[column] * noise).round()
+    sample['ads_id'] = [f'syn{i}' for i in range(len(sample))]
+
+    sample.to_csv(path, index=False)
+    return path
+
+def timed(fn, repeat=3):
+    """Run fn `repeat` times and return (result of the last run, timing summary)"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, {'min_s': min(timings), 'median_s': float(np.median(timings)),
+                    'repeat': repeat}
+
+def time_startup(imports, call, model_dir, repeat=3):
+    """Import time and first-prediction time of an entry point in fresh interpreters"""
+    script = STARTUP_SCRIPT.format(imports=imports, call=call, model_dir=model_dir)
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', script], cwd=REPO_DIR, check=True,
+                                capture_output=True, text=True).stdout
+        runs.append(json.loads(output.splitlines()[-1]))
+    totals = [run['import_s'] + run['first_prediction_s'] for run in runs]
+    return {'min_s': min(totals), 'median_s': float(np.median(totals)), 'repeat': repeat,
+            'import_s': min(run['import_s'] for run in runs),
+            'first_prediction_s': min(run['first_prediction_s'] for run in runs)}
+
+def fit_preprocessing(df):
+    """Imputer + scaler on the basic features"""
+    X = df[FEATURES].astype('float64')
+    imputer = SimpleImputer(strategy='median')
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(imputer.fit_transform(X))
+    return imputer, scaler, X_scaled
+
+def run_scale(path, scale, models, repeat):
+    """Run every benchmark on one synthetic dataset"""
+    with tempfile.TemporaryDirectory(prefix='bench_') as cache_dir:
+        return _run_scale(path, scale, models, repeat, cache_dir)
+
+def _run_scale(path, scale, models, repeat, cache_dir):
+    """Benchmarks for one dataset, using cache_dir for the cache and artifacts"""
+    results = {}
+
+    _, results['csv_load'] = timed(lambda: pd.read_csv(path), repeat)
+    load_dataset(path, cache_dir=cache_dir)
+    _, results['cached_load'] = timed(
+        lambda: load_dataset(path, columns=FEATURES + [TARGET], cache_dir=cache_dir), repeat
+    )
+
+    df = load_dataset(path, cache_dir=cache_dir)
+    y = df[TARGET].to_numpy()
+    _, results['feature_engineering'] = timed(lambda: FeatureEngineer().fit_transform(df, y), repeat)
+    (imputer, scaler, X_scaled), results['preprocessing'] = timed(
+        lambda: fit_preprocessing(df), repeat
+    )
+
+    trained = {}
+    for model_type in models:
+        trainer = ModelTrainer(model_type)
+        _, results[f'train_{model_type}'] = timed(
+            lambda: trainer.train_model(X_scaled, y), repeat=1
+        )
+        trained[model_type] = trainer.model
+
+    # Prediction benchmarks use the forest when it was trained
+    predict_model = 'random_forest' if 'random_forest' in trained else models[0]
+    model = trained[predict_model]
+    pipeline = InferencePipeline.from_components(imputer, scaler, model)
+    X_raw = df[FEATURES].astype('float64').to_numpy()
+    single_row = X_raw[:1]
+
+    # Prediction goes through the serving entry point: registry lookup, file
+    # signature check and the fused pipeline, from a temporary model directory
+    model_dir = os.path.join(cache_dir, 'models')
+    os.makedirs(model_dir)
+    pipeline.save(os.path.join(model_dir, prediction.PIPELINE_FILE))
+    prediction.make_prediction(single_row, model_dir)
+
+    # Model path without the result cache, then repeated rows served from it
+    prediction.configure_prediction_cache(0)
+    try:
+        _, results['predict_single_row'] = timed(
+            lambda: prediction.make_prediction(single_row, model_dir), repeat * 10
+        )
+        _, results['predict_batch'] = timed(
+            lambda: prediction.make_prediction(X_raw, model_dir), repeat
+        )
+    finally:
+        prediction.configure_prediction_cache()
+    _, results['predict_single_row_cached'] = timed(
+        lambda: prediction.make_prediction(single_row, model_dir), repeat * 10
+    )
+    results['predict_batch']['rows_per_s'] = len(X_raw) / results['predict_batch']['min_s']
+
+    artifact_path = os.path.join(cache_dir, 'pipeline.pkl')
+    pipeline.save(artifact_path)
+    results['artifact_bytes'] = os.path.getsize(artifact_path)
+    _, results['artifact_load'] = timed(lambda: InferencePipeline.load(artifact_path), repeat)
+
+    # Startup cost of a one-off prediction, with the artifacts train_model.py writes
+    if FlatForest.supports(model):
+        compact = CompactForest.from_estimator(model)
+        pipeline.to_flat(compact).save(os.path.join(model_dir, 'house_price_pipeline_flat.pkl'))
+        SlimPipeline.from_pipeline(pipeline, compact).save(
+            os.path.join(model_dir, 'house_price_pipeline_slim.npz'))
+        for name, (imports, call) in STARTUP_ENTRY_POINTS.items():
+            results[name] = time_startup(imports, call, model_dir, repeat)
+
+    return {'rows': len(df), 'scale': scale, 'predict_model': predict_model,
+            'benchmarks': results}
+
+def environment():
+    """Versions and machine details stored with the results"""
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count()
+    }
+
+def latest_result():
+    """Path of the most recent stored result, if any"""
+    paths = sorted(glob.glob(os.path.join(RESULTS_DIR, '*.json')))
+    return paths[-1] if paths else None
+
+def compare(current, baseline, threshold=0.10):
+    """Print the min-time ratio of each benchmark against a baseline run"""
+    print(f"\nComparison with {baseline['timestamp']} (regression threshold {threshold:.0%})")
+    source = (current.get('source_hash'), current.get('seed'))
+    if (baseline.get('source_hash'), baseline.get('seed')) != source:
+        print("  Baseline was generated from a different source dataset or seed; not comparable")
+        return
+    for scale, run in current['runs'].items():
+        previous = baseline['runs'].get(scale)
+        if previous is None:
+            continue
+        if previous.get('predict_model') != run.get('predict_model'):
+            print(f"  {scale:>4}x prediction benchmarks use different models; not comparable")
+        for name, timing in run['benchmarks'].items():
+            old = previous['benchmarks'].get(name)
+            if not isinstance(timing, dict) or not isinstance(old, dict):
+                continue
+            ratio = timing['min_s'] / old['min_s']
+            flag = 'REGRESSION' if ratio > 1 + threshold else ''
+            print(f"  {scale:>4}x {name:<30} {old['min_s']:.4f}s -> {timing['min_s']:.4f}s "
+                  f"({ratio:.2f}x) {flag}")
+
+def main(argv=None):
+    """Run the benchmark suite"""
+    parser = argparse.ArgumentParser(description="Training and inference benchmarks")
+    parser.add_argument('--source', default=SOURCE_PATH)
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10])
+    parser.add_argument('--models', nargs='+', default=DEFAULT_MODELS)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42,
+                        help="Seed of the synthetic datasets")
+    parser.add_argument('--compare', metavar='JSON',
+                        help="Baseline result file (default: latest stored result)")
+    args = parser.parse_args(argv)
+
+    baseline_path = args.compare or latest_result()
+
+    current = {
+        'timestamp': time.strftime('%Y%m%d%H%M%S'),
+        'environment': environment(),
+        'source': args.source,
+        'source_hash': source_hash(args.source, DATA_DIR),
+        'seed': args.seed,
+        'runs': {}
+    }
+    for scale in args.scales:
+        path = make_synthetic(args.source, scale, args.seed)
+        print(f"Running {scale}x ({path})...")
+        run = run_scale(path, scale, args.models, args.repeat)
+        current['runs'][str(scale)] = run
+        for name, timing in run['benchmarks'].items():
+            if isinstance(timing, dict):
+                print(f"  {name:<30} min {timing['min_s']:.4f}s  median {timing['median_s']:.4f}s")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    result_path = os.path.join(RESULTS_DIR, f"{current['timestamp']}.json")
+    with open(result_path, 'w') as f:
+        json.dump(current, f, indent=2)
+    print(f"Results saved to {result_path}")
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            compare(current, json.load(f))
+
+if __name__ == "__main__":
+    main()
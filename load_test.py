@@ -0,0 +1,78 @@
+"""Local load test for the prediction service (service.py)
+
+Sends concurrent /predict requests and reports throughput and latency
+percentiles, e.g.:
+
+    python service.py --port 8000 &
+    python load_test.py --url http://127.0.0.1:8000 --concurrency 64 --requests 5000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import numpy as np
+from aiohttp import ClientSession, TCPConnector
+
+def random_listing(rng):
+    """Generate a plausible listing payload"""
+    return {
+        'land_size_m2': rng.randint(30, 500),
+        'building_size_m2': rng.randint(30, 400),
+        'bedrooms': rng.randint(1, 6)
+    }
+
+async def run_load_test(url, concurrency, total_requests, seed=42):
+    """Fire requests from concurrent clients and collect latencies"""
+    rng = random.Random(seed)
+    payloads = [random_listing(rng) for _ in range(total_requests)]
+    latencies = []
+    errors = 0
+    next_index = 0
+
+    async def client(session):
+        nonlocal next_index, errors
+        while next_index < total_requests:
+            payload = payloads[next_index]
+            next_index += 1
+            start = time.perf_counter()
+            async with session.post(f'{url}/predict', json=payload) as response:
+                await response.read()
+                if response.status != 200:
+                    errors += 1
+                    continue
+            latencies.append(time.perf_counter() - start)
+
+    connector = TCPConnector(limit=concurrency)
+    async with ClientSession(connector=connector) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return np.array(latencies), errors, elapsed
+
+def report(latencies, errors, elapsed, concurrency):
+    """Print throughput and latency percentiles"""
+    latencies_ms = latencies * 1000
+    print(f"Concurrency: {concurrency}")
+    print(f"Requests: {len(latencies)} ok, {errors} errors in {elapsed:.2f}s")
+    print(f"Throughput: {len(latencies) / elapsed:,.0f} req/sec")
+    for q in (50, 95, 99):
+        print(f"p{q}: {np.percentile(latencies_ms, q):.2f} ms")
+
+def main(argv=None):
+    """Run the load test"""
+    parser = argparse.ArgumentParser(description="Load test for service.py")
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    latencies, errors, elapsed = asyncio.run(
+        run_load_test(args.url, args.concurrency, args.requests)
+    )
+    report(latencies, errors, elapsed, args.concurrency)
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,437 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import joblib
+import numpy as np
 import pandas as pd
-from sklearn.preprocessing import StandardScaler
 
-def load_model():
-    """Load the trained model"""
-    model_path = 'models/house_price_model.pkl'
-    scaler_path = 'models/scaler.pkl'
-    imputer_path = 'models/imputer.pkl'
+from src.inference import InferencePipeline
+from src.metrics import get_metrics
+from src.model_registry import ModelRegistry
+from src.prediction_cache import PredictionCache
+
+MODEL_DIR = 'models'
+PIPELINE_FILE = 'house_price_pipeline.pkl'
+FLAT_PIPELINE_FILE = 'house_price_pipeline_flat.pkl'
+DEFAULT_CHUNKSIZE = 100_000
+ID_COLUMN = 'ads_id'
+TARGET = 'price_in_rp'
+COMPS_DATA_PATH = os.path.join('app', 'jabodetabek_house_price.csv')
+SHARD_DIR = 'shards'
+SHARD_INDEX_FILE = 'index.json'
+
+# Artifacts are loaded once per process; other versions (other model
+# directories, the memory-mapped and private copies of a pipeline, shards,
+# comparables) stay resident until the LRU limit is reached
+registry = ModelRegistry(max_versions=6)
+
+# Prediction results per model directory, keyed on the feature row and model
+# version; max_entries=0 disables the cache
+DEFAULT_CACHE_SIZE = 10_000
+_cache_settings = {'max_entries': DEFAULT_CACHE_SIZE, 'ttl': None}
+_prediction_caches = {}
+
+# Model version last reported in the model_info gauge, per model directory
+_reported_versions = {}
+_reported_versions_lock = threading.Lock()
+
+def _artifact_paths(model_dir):
+    """Paths of the model, scaler and imputer artifacts"""
+    return (
+        os.path.join(model_dir, 'house_price_model.pkl'),
+        os.path.join(model_dir, 'scaler.pkl'),
+        os.path.join(model_dir, 'imputer.pkl'),
+    )
+
+def _load_artifacts(paths):
+    """Load the artifacts from disk"""
+    return tuple(joblib.load(path) for path in paths)
+
+def load_model(model_dir=MODEL_DIR, use_cache=True):
+    """Load the trained model, reusing the cached copy while the files are unchanged"""
+    paths = _artifact_paths(model_dir)
+    if not use_cache:
+        return _load_artifacts(paths)
+
+    return registry.get(model_dir, paths, lambda: _load_artifacts(paths))
+
+def _load_legacy_pipeline(paths):
+    """Build a fused pipeline from the separate model, scaler and imputer pickles"""
+    model, scaler, imputer = _load_artifacts(paths)
+    return InferencePipeline.from_components(imputer, scaler, model, version='legacy')
+
+def _flat_pipeline_path(model_dir):
+    """Path of the memory-mappable pipeline, if it is present and not stale"""
+    pipeline_path = os.path.join(model_dir, PIPELINE_FILE)
+    flat_path = os.path.join(model_dir, FLAT_PIPELINE_FILE)
+    if not os.path.exists(flat_path):
+        return None
+    if os.path.exists(pipeline_path) and os.path.getmtime(flat_path) < os.path.getmtime(pipeline_path):
+        return None
+    return flat_path
+
+def load_pipeline(model_dir=MODEL_DIR, use_cache=True, mmap=False):
+    """Load the fused inference pipeline, falling back to the separate artifacts
+
+    By default the sklearn forest is served: its compiled tree traversal is
+    about 3x faster on batches than the NumPy traversal of the compact
+    forest. With mmap=True the compact forest artifact is preferred and its
+    arrays are memory-mapped, so every process shares one page-cached copy
+    (smaller and faster to load, slower on large batches).
+    """
+    pipeline_path = os.path.join(model_dir, PIPELINE_FILE)
+    flat_path = _flat_pipeline_path(model_dir) if mmap else None
+    if flat_path is not None:
+        paths = (flat_path,)
+        loader = lambda: InferencePipeline.load(flat_path, mmap_mode='r')
+    elif os.path.exists(pipeline_path):
+        paths = (pipeline_path,)
+        loader = lambda: InferencePipeline.load(pipeline_path)
+    else:
+        paths = _artifact_paths(model_dir)
+        loader = lambda: _load_legacy_pipeline(paths)
+
+    if not use_cache:
+        return loader()
+
+    # Keyed on the resolved artifact so mmap and private loads do not evict each other
+    return registry.get(f'{model_dir}:pipeline:{paths[0]}', paths, loader)
 
-    model = joblib.load(model_path)
-    scaler = joblib.load(scaler_path)
-    imputer = joblib.load(imputer_path)
+def configure_prediction_cache(max_entries=DEFAULT_CACHE_SIZE, ttl=None):
+    """Resize the prediction result cache (0 disables it) and drop cached results"""
+    _cache_settings.update(max_entries=max_entries, ttl=ttl)
+    _prediction_caches.clear()
 
-    return model, scaler, imputer
+def prediction_cache(model_dir=MODEL_DIR):
+    """The prediction result cache of a model directory, or None when disabled"""
+    if not _cache_settings['max_entries']:
+        return None
+    cache = _prediction_caches.get(model_dir)
+    if cache is None:
+        cache = _prediction_caches.setdefault(model_dir, PredictionCache(**_cache_settings))
+    return cache
 
-def make_prediction(input_data):
-    """Make a prediction using the input data"""
-    model, scaler, imputer = load_model()
+def _timed_predict(pipeline, input_data, metrics):
+    """Preprocess and predict, timing each stage"""
+    with metrics.timer('prediction_stage_seconds', stage='preprocess'):
+        features = pipeline.transform(input_data)
+    with metrics.timer('prediction_stage_seconds', stage='predict'):
+        return pipeline.predict_transformed(features)
 
-    # Impute missing values
-    input_data_imputed = imputer.transform(input_data)
+def make_prediction(input_data, model_dir=MODEL_DIR):
+    """Make a prediction using the input data
 
-    # Scale the input data
-    input_data_scaled = scaler.transform(input_data_imputed)
+    Rows already scored by the current model are served from the
+    prediction cache; only the remaining rows reach the model.
+    """
+    metrics = get_metrics()
+    cache = prediction_cache(model_dir)
+    if not metrics.enabled:
+        # Impute, scale and predict in one fused step
+        pipeline = load_pipeline(model_dir)
+        if cache is None:
+            return pipeline.predict(input_data)
+        return cache.predict(pipeline, input_data)
 
-    # Make the prediction
-    prediction = model.predict(input_data_scaled)
+    with metrics.timer('prediction_stage_seconds', stage='load'):
+        pipeline = load_pipeline(model_dir)
+    predict = lambda rows: _timed_predict(pipeline, rows, metrics)
+    if cache is None:
+        prediction = predict(input_data)
+    else:
+        prediction = cache.predict(pipeline, input_data, predict)
+
+    metrics.increment('prediction_calls_total')
+    metrics.increment('rows_scored_total', len(prediction))
+    _report_model_info(metrics, model_dir, pipeline.version)
 
     return prediction
 
-def main():
+def _report_model_info(metrics, model_dir, version):
+    """Expose the served model version, dropping the series of the previous one"""
+    if _reported_versions.get(model_dir) != version:
+        with _reported_versions_lock:
+            if _reported_versions.get(model_dir) != version:
+                metrics.remove_gauge('model_info', model_dir=model_dir)
+                _reported_versions[model_dir] = version
+    metrics.set_gauge('model_info', 1, model_dir=model_dir, version=version)
+
+def _build_comparables(data_path):
+    """Build the spatial index over the listings of a dataset"""
+    # Deferred: sklearn.neighbors alone takes over a second to import
+    from src.comparables import ComparableIndex
+    from src.dataset_cache import load_dataset
+
+    df = load_dataset(data_path)
+    return ComparableIndex().fit(df, df[TARGET])
+
+def load_comparables(data_path=COMPS_DATA_PATH, use_cache=True):
+    """Load the comparable-listings index, rebuilt only when the dataset changes"""
+    if not use_cache:
+        return _build_comparables(data_path)
+
+    return registry.get(f'{data_path}:comparables', (data_path,),
+                        lambda: _build_comparables(data_path))
+
+def find_comparables(listing, k=5, data_path=COMPS_DATA_PATH):
+    """The k nearest similar listings (with prices) for a listing with lat/long"""
+    index = load_comparables(data_path)
+    return index.query(listing['lat'], listing['long'], k,
+                       bedrooms=listing.get('bedrooms'),
+                       building_size_m2=listing.get('building_size_m2'))
+
+def shard_key(values):
+    """Normalized shard keys for a column of raw values (e.g. city names)"""
+    return pd.Series(values, dtype='string').str.strip().str.lower()
+
+class ShardRouter:
+    """Dispatch each row to the pipeline of its shard (e.g. its city)
+
+    Rows whose shard has no model of its own (unseen or too small at training
+    time) are scored by the fallback pipeline.
+    """
+
+    def __init__(self, column, shards, fallback=None):
+        self.column = column
+        self.shards = shards
+        self.fallback = fallback
+
+    @property
+    def version(self):
+        return max(pipeline.version for pipeline in self.shards.values())
+
+    @property
+    def input_columns(self):
+        pipelines = list(self.shards.values()) + ([self.fallback] if self.fallback else [])
+        columns = [self.column]
+        for pipeline in pipelines:
+            columns += [c for c in pipeline.input_columns if c not in columns]
+        return columns
+
+    def predict(self, data):
+        """Predict every row with its shard model; data must be a DataFrame"""
+        if self.column not in data.columns:
+            raise ValueError(f"Shard column not found: {self.column}")
+
+        codes, keys = pd.factorize(shard_key(data[self.column]), use_na_sentinel=True)
+        prediction = np.empty(len(data))
+        unrouted = np.ones(len(data), dtype=bool)
+        for code, key in enumerate(keys):
+            pipeline = self.shards.get(key)
+            if pipeline is None:
+                continue
+            rows = codes == code
+            prediction[rows] = pipeline.predict(data[rows])
+            unrouted &= ~rows
+
+        if unrouted.any():
+            if self.fallback is None:
+                missing = sorted(set(data.loc[unrouted, self.column].astype(str)))
+                raise ValueError(f"No shard model and no fallback for: {missing}")
+            prediction[unrouted] = self.fallback.predict(data[unrouted])
+        return prediction
+
+def _shard_paths(model_dir):
+    """Paths of the shard index and every shard artifact it lists"""
+    index_path = os.path.join(model_dir, SHARD_DIR, SHARD_INDEX_FILE)
+    with open(index_path) as f:
+        index = json.load(f)
+    files = {key: os.path.join(model_dir, SHARD_DIR, name) for key, name in index['shards'].items()}
+    return index, index_path, files
+
+def _load_shards(files):
+    """Load every shard pipeline"""
+    return {key: InferencePipeline.load(path) for key, path in files.items()}
+
+def load_shard_router(model_dir=MODEL_DIR, use_cache=True, mmap=False):
+    """Load the per-shard pipelines, with the global pipeline as the fallback"""
+    index, index_path, files = _shard_paths(model_dir)
+    has_global = os.path.exists(os.path.join(model_dir, PIPELINE_FILE))
+    fallback = load_pipeline(model_dir, use_cache, mmap) if has_global else None
+
+    if not use_cache:
+        shards = _load_shards(files)
+    else:
+        paths = (index_path,) + tuple(files.values())
+        shards = registry.get(f'{model_dir}:shards', paths, lambda: _load_shards(files))
+    return ShardRouter(index['column'], shards, fallback)
+
+# Pipeline held by each pool worker, loaded once in the worker initializer
+_worker_pipeline = None
+
+def _init_worker(model_dir, mmap=False):
+    """Load the pipeline once per worker process"""
+    global _worker_pipeline
+    _worker_pipeline = load_pipeline(model_dir, mmap=mmap)
+
+def _predict_shard(features):
+    """Predict one shard of the feature matrix inside a worker"""
+    return _worker_pipeline.predict(features)
+
+def create_worker_pool(n_workers, model_dir=MODEL_DIR, mmap=False):
+    """Create a process pool whose workers each hold the pipeline"""
+    return ProcessPoolExecutor(
+        max_workers=n_workers, initializer=_init_worker, initargs=(model_dir, mmap)
+    )
+
+def memory_usage():
+    """Resident (RSS) and proportional (PSS) memory of this process in MB
+
+    PSS splits shared pages between the processes mapping them, so it shows
+    how much of the RSS is really owned by one worker.
+    """
+    usage = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                key, value = line.split(':', 1)
+                if key in ('Rss', 'Pss'):
+                    usage[key.lower() + '_mb'] = int(value.split()[0]) / 1024
+    except OSError:
+        import resource
+        usage['rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return usage
+
+def _worker_memory(delay):
+    """Warm the worker's model with a batch of rows and report its memory"""
+    n_features = len(_worker_pipeline.feature_names)
+    rows = np.random.default_rng(os.getpid()).normal(size=(1024, n_features))
+    _worker_pipeline.predict_transformed(rows)
+
+    # Keep this worker busy so the remaining calls land on the other workers
+    time.sleep(delay)
+    return os.getpid(), memory_usage()
+
+def worker_memory_report(n_workers, model_dir=MODEL_DIR, mmap=True):
+    """Memory of each worker after loading the pipeline, keyed by pid"""
+    with create_worker_pool(n_workers, model_dir, mmap) as pool:
+        return dict(pool.map(_worker_memory, [0.5] * n_workers))
+
+def predict_parallel(input_data, pool, n_shards, model_dir=MODEL_DIR):
+    """Shard rows across the worker pool and reassemble predictions in order"""
+    pipeline = load_pipeline(model_dir)
+    features = pipeline.to_array(input_data)
+
+    shards = np.array_split(features, min(n_shards, max(len(features), 1)))
+    return np.concatenate(list(pool.map(_predict_shard, shards)))
+
+def iter_predictions(input_path, model_dir=MODEL_DIR, chunksize=DEFAULT_CHUNKSIZE, pool=None,
+                     n_workers=1, mmap=False, sharded=False):
+    """Yield a DataFrame of predictions for each chunk of an input CSV"""
+    if sharded:
+        pipeline = load_shard_router(model_dir, mmap=mmap)
+    else:
+        pipeline = load_pipeline(model_dir, mmap=mmap)
+
+    # Only parse the feature columns (and the listing id, when present)
+    header = pd.read_csv(input_path, nrows=0).columns
+    id_columns = [ID_COLUMN] if ID_COLUMN in header else []
+    usecols = id_columns + [column for column in pipeline.input_columns if column in header]
+
+    for chunk in pd.read_csv(input_path, usecols=usecols, chunksize=chunksize):
+        result = chunk[id_columns].copy()
+        if pool is None:
+            result['predicted_price'] = pipeline.predict(chunk)
+        else:
+            result['predicted_price'] = predict_parallel(chunk, pool, n_workers, model_dir)
+        yield result
+
+def _write_csv(chunks, output_path):
+    """Stream prediction chunks into a CSV file"""
+    rows = 0
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(output_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        rows += len(chunk)
+    return rows
+
+def _write_parquet(chunks, output_path):
+    """Stream prediction chunks into a Parquet file, one row group per chunk"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet output requires pyarrow (pip install pyarrow)") from e
+
+    rows = 0
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, table.schema)
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+def predict_file(input_path, output_path, model_dir=MODEL_DIR, chunksize=DEFAULT_CHUNKSIZE,
+                 n_workers=1, mmap=False, sharded=False):
+    """Score a CSV file chunk by chunk and stream the results to CSV or Parquet"""
+    write = _write_parquet if output_path.endswith('.parquet') else _write_csv
+
+    if n_workers <= 1 or sharded:
+        chunks = iter_predictions(input_path, model_dir, chunksize, mmap=mmap, sharded=sharded)
+        return write(chunks, output_path)
+
+    with create_worker_pool(n_workers, model_dir, mmap) as pool:
+        chunks = iter_predictions(input_path, model_dir, chunksize, pool, n_workers, mmap)
+        return write(chunks, output_path)
+
+def parse_args(argv=None):
+    """Parse the command line arguments"""
+    parser = argparse.ArgumentParser(description="Predict house prices")
+    parser.add_argument('--input', help="CSV of listings to score (batch mode)")
+    parser.add_argument('--output', default='predictions.csv',
+                        help="Output file (.csv or .parquet)")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help="Rows per chunk")
+    parser.add_argument('--model-dir', default=MODEL_DIR, help="Model artifact directory")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Worker processes for batch mode")
+    parser.add_argument('--mmap', action='store_true',
+                        help="Memory-map the compact forest so workers share one copy "
+                             "(less memory, about 3x slower on large batches)")
+    parser.add_argument('--memory-report', action='store_true',
+                        help="Report per-worker memory with and without memory-mapping")
+    parser.add_argument('--sharded', action='store_true',
+                        help="Route each row to its per-city shard model (single process)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main function for prediction"""
-    # Example input data
-    input_data = pd.DataFrame({'luas_tanah': [100], 'luas_bangunan': [50], 'jumlah_kamar': [3]})
+    args = parse_args(argv)
+    mmap = args.mmap
+
+    if args.memory_report:
+        n_workers = max(args.workers, 2)
+        for label, use_mmap in (('private copy', False), ('memory-mapped', True)):
+            report = worker_memory_report(n_workers, args.model_dir, use_mmap)
+            print(f"{label}:")
+            for pid, usage in report.items():
+                details = ', '.join(f"{key[:-3].upper()} {value:.1f} MB"
+                                    for key, value in usage.items())
+                print(f"  worker {pid}: {details}")
+        return
+
+    if args.input:
+        start = time.perf_counter()
+        rows = predict_file(args.input, args.output, args.model_dir, args.chunksize,
+                            args.workers, mmap, args.sharded)
+        elapsed = time.perf_counter() - start
+        print(f"Scored {rows} rows in {elapsed:.2f}s "
+              f"({rows / elapsed:,.0f} rows/sec, {args.workers} workers) -> {args.output}")
+        return
+
+    # Example input data; a plain dict is enough for a single row
+    input_data = {'land_size_m2': 100, 'building_size_m2': 50, 'bedrooms': 3}
 
-    prediction = make_prediction(input_data)
+    prediction = make_prediction(input_data, args.model_dir)
 
     print(f"Predicted house price: {prediction[0]:.2f}")
 
@@ -0,0 +1,284 @@
+"""HTTP JSON API for house price prediction
+
+Endpoints:
+- POST /predict        one listing as a JSON object; with --comps-data and
+                       lat/long in the listing, nearby comparable sales are
+                       returned as well
+- POST /predict/batch  {"instances": [...]} or a JSON list of listings
+- GET  /health         model version, batching settings and prediction
+                       cache hit rate
+- GET  /metrics        Prometheus text metrics
+
+Concurrent /predict requests are coalesced into micro-batches so the
+model is called once per batch instead of once per request. Listings
+already scored by the current model are answered from the prediction
+cache.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+
+import numpy as np
+import pandas as pd
+from aiohttp import web
+
+import prediction
+from src.metrics import (
+    FanoutMetrics, MetricsRegistry, StructuredLogSink, get_metrics, set_metrics
+)
+
+class MicroBatcher:
+    """Collect single-row requests for a short window and predict them together"""
+
+    def __init__(self, model_dir=prediction.MODEL_DIR, max_batch_size=256, max_wait_ms=5.0):
+        self.model_dir = model_dir
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = None
+        self._task = None
+
+    async def start(self):
+        """Start the background batching loop"""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the batching loop"""
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def predict(self, row):
+        """Queue one feature row and wait for its prediction"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        return await future
+
+    async def _collect(self):
+        """Wait for the first request, then gather more until the window closes"""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _predict(self, rows):
+        """Run the model on a stacked batch (called in a worker thread)"""
+        return _predict_rows(rows, self.model_dir)
+
+    async def _run(self):
+        """Batching loop"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            rows = [row for row, _ in batch]
+            get_metrics().increment('microbatches_total')
+            try:
+                predictions = await loop.run_in_executor(None, self._predict, rows)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), value in zip(batch, predictions):
+                if not future.done():
+                    future.set_result(float(value))
+
+def _predict_rows(rows, model_dir):
+    """Predict parsed rows in one model call (called in a worker thread)
+
+    Raw listings (dicts) become a single DataFrame so feature engineering
+    runs once per batch, off the event loop.
+    """
+    if isinstance(rows[0], dict):
+        return prediction.make_prediction(pd.DataFrame(rows), model_dir)
+    return prediction.make_prediction(np.vstack(rows), model_dir)
+
+def _parse_row(instance, pipeline):
+    """Convert one JSON listing into a feature row; missing fields become NaN
+
+    Pipelines with a feature engineering stage keep the raw listing; it is
+    transformed together with the rest of its batch in _predict_rows.
+    """
+    if not isinstance(instance, dict):
+        raise web.HTTPBadRequest(reason="Each instance must be a JSON object")
+
+    if pipeline.feature_engineer is not None:
+        return instance
+
+    row = []
+    for name in pipeline.feature_names:
+        value = instance.get(name)
+        if value is None:
+            row.append(math.nan)
+            continue
+        try:
+            row.append(float(value))
+        except (TypeError, ValueError):
+            raise web.HTTPBadRequest(reason=f"Field '{name}' must be numeric")
+    return np.array(row, dtype=np.float64)
+
+def _parse_comparables_query(instance):
+    """Numeric lat/long (required) and bedrooms/building size (optional) for find_comparables"""
+    query = {}
+    for name in ('lat', 'long', 'bedrooms', 'building_size_m2'):
+        value = instance.get(name)
+        if value is None:
+            continue
+        try:
+            query[name] = float(value)
+        except (TypeError, ValueError):
+            raise web.HTTPBadRequest(reason=f"Field '{name}' must be numeric")
+    for name in ('lat', 'long'):
+        if not math.isfinite(query[name]):
+            raise web.HTTPBadRequest(reason=f"Field '{name}' must be a finite number")
+    return query
+
+async def _read_json(request):
+    """Read the request body as JSON"""
+    try:
+        return await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(reason="Request body must be valid JSON")
+
+async def _load_pipeline(app):
+    """Load (or revalidate) the pipeline in a worker thread, off the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, prediction.load_pipeline, app['model_dir'])
+
+async def handle_predict(request):
+    """Predict the price of a single listing"""
+    app = request.app
+    pipeline = await _load_pipeline(app)
+    instance = await _read_json(request)
+    row = _parse_row(instance, pipeline)
+
+    price = await app['batcher'].predict(row)
+    response = {'predicted_price': price, 'model_version': pipeline.version}
+
+    if app['comps_data'] and instance.get('lat') is not None and instance.get('long') is not None:
+        query = _parse_comparables_query(instance)
+        loop = asyncio.get_running_loop()
+        comparables = await loop.run_in_executor(
+            None, prediction.find_comparables, query, app['comps_k'], app['comps_data']
+        )
+        response['comparables'] = json.loads(comparables.to_json(orient='records'))
+    return web.json_response(response)
+
+async def handle_predict_batch(request):
+    """Predict the prices of a list of listings in one model call"""
+    app = request.app
+    pipeline = await _load_pipeline(app)
+
+    body = await _read_json(request)
+    instances = body.get('instances') if isinstance(body, dict) else body
+    if not isinstance(instances, list) or not instances:
+        raise web.HTTPBadRequest(reason="Expected a non-empty list of instances")
+
+    rows = [_parse_row(instance, pipeline) for instance in instances]
+    loop = asyncio.get_running_loop()
+    predictions = await loop.run_in_executor(None, _predict_rows, rows, app['model_dir'])
+    return web.json_response({
+        'predicted_prices': [float(value) for value in predictions],
+        'model_version': pipeline.version
+    })
+
+async def handle_health(request):
+    """Report the loaded model version and batching settings"""
+    app = request.app
+    pipeline = await _load_pipeline(app)
+    batcher = app['batcher']
+    cache = prediction.prediction_cache(app['model_dir'])
+    return web.json_response({
+        'status': 'ok',
+        'model_version': pipeline.version,
+        'max_batch_size': batcher.max_batch_size,
+        'max_wait_ms': batcher.max_wait * 1000,
+        'prediction_cache': cache.stats() if cache is not None else None
+    })
+
+async def handle_metrics(request):
+    """Expose the collected metrics in Prometheus text format"""
+    return web.Response(text=request.app['metrics'].render_prometheus(),
+                        content_type='text/plain', charset='utf-8')
+
+def create_app(model_dir=prediction.MODEL_DIR, max_batch_size=256, max_wait_ms=5.0,
+               log_metrics=False, comps_data=None, comps_k=5,
+               cache_size=prediction.DEFAULT_CACHE_SIZE, cache_ttl=None):
+    """Build the aiohttp application"""
+    app = web.Application()
+    prediction.configure_prediction_cache(cache_size, cache_ttl)
+    app['model_dir'] = model_dir
+    app['comps_data'] = comps_data
+    app['comps_k'] = comps_k
+
+    app['metrics'] = MetricsRegistry()
+    if log_metrics:
+        set_metrics(FanoutMetrics(app['metrics'], StructuredLogSink()))
+    else:
+        set_metrics(app['metrics'])
+    app['batcher'] = MicroBatcher(model_dir, max_batch_size, max_wait_ms)
+
+    async def on_startup(app):
+        # Load the model (and comparables index) before accepting traffic
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, prediction.load_pipeline, model_dir)
+        if comps_data:
+            await loop.run_in_executor(None, prediction.load_comparables, comps_data)
+        await app['batcher'].start()
+
+    async def on_cleanup(app):
+        await app['batcher'].stop()
+
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    app.router.add_post('/predict', handle_predict)
+    app.router.add_post('/predict/batch', handle_predict_batch)
+    app.router.add_get('/health', handle_health)
+    app.router.add_get('/metrics', handle_metrics)
+    return app
+
+def main(argv=None):
+    """Run the prediction service"""
+    parser = argparse.ArgumentParser(description="House price prediction HTTP service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--model-dir', default=prediction.MODEL_DIR)
+    parser.add_argument('--max-batch-size', type=int, default=256)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0,
+                        help="Micro-batching window in milliseconds")
+    parser.add_argument('--log-metrics', action='store_true',
+                        help="Also write every metric event as a JSON log line")
+    parser.add_argument('--comps-data', metavar='CSV',
+                        help="Listings dataset for comparable-sales lookup (disabled by default)")
+    parser.add_argument('--comps-k', type=int, default=5,
+                        help="Number of comparable listings returned per prediction")
+    parser.add_argument('--cache-size', type=int, default=prediction.DEFAULT_CACHE_SIZE,
+                        help="Prediction results kept in the LRU cache (0 disables it)")
+    parser.add_argument('--cache-ttl', type=float,
+                        help="Seconds a cached prediction stays valid (default: until reload)")
+    args = parser.parse_args(argv)
+
+    if args.log_metrics:
+        logging.basicConfig(level=logging.INFO)
+
+    app = create_app(args.model_dir, args.max_batch_size, args.max_wait_ms, args.log_metrics,
+                     args.comps_data, args.comps_k, args.cache_size, args.cache_ttl)
+    web.run_app(app, host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Modul Pembanding Harga Rumah (Comps)
+
+Membangun BallTree dengan metrik haversine di atas koordinat lat/long
+listing sehingga k listing terdekat dapat dicari dalam hitungan
+mikrodetik, tanpa memindai seluruh tabel.
+
+Digunakan untuk:
+- Menampilkan rumah pembanding terdekat yang mirip beserta harganya
+- Fitur agregat lingkungan (median harga per m² dan jarak tetangga) untuk training
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+
+EARTH_RADIUS_KM = 6371.0088
+
+COMPARABLE_COLUMNS = ['ads_id', 'district', 'city', 'land_size_m2', 'building_size_m2',
+                      'bedrooms', 'price_in_rp']
+
+
+def _coordinates(lat, long):
+    """
+    Mengubah lat/long (derajat) menjadi radian berbentuk (n, 2)
+    """
+    lat = np.atleast_1d(np.asarray(lat, dtype=np.float64))
+    long = np.atleast_1d(np.asarray(long, dtype=np.float64))
+    return np.radians(np.column_stack([lat, long]))
+
+
+def _column_or_nan(data, name):
+    """
+    Mengambil kolom; kolom yang tidak ada dianggap missing value seluruhnya
+    """
+    if name in data.columns:
+        return data[name]
+    return pd.Series(np.nan, index=data.index)
+
+
+class ComparableIndex:
+    def __init__(self, leaf_size=40):
+        """
+        Inisialisasi indeks pembanding
+
+        Args:
+            leaf_size (int): Ukuran daun BallTree
+        """
+        self.leaf_size = leaf_size
+        self.tree_ = None
+        self.listings_ = None
+        self.bedrooms_ = None
+        self.building_size_ = None
+        self.price_per_m2_ = None
+        self.source_positions_ = None
+
+    def fit(self, data, y):
+        """
+        Membangun indeks dari listing yang memiliki koordinat
+
+        Args:
+            data (pandas.DataFrame): Data mentah dengan kolom lat dan long
+            y (array): Harga listing
+
+        Returns:
+            ComparableIndex: Objek ini
+        """
+        lat = pd.to_numeric(_column_or_nan(data, 'lat'), errors='coerce').to_numpy(dtype=np.float64)
+        long = pd.to_numeric(_column_or_nan(data, 'long'), errors='coerce').to_numpy(dtype=np.float64)
+        price = np.asarray(y, dtype=np.float64)
+        valid = ~(np.isnan(lat) | np.isnan(long) | np.isnan(price))
+
+        columns = [column for column in COMPARABLE_COLUMNS if column in data.columns]
+        listings = data.loc[valid, [c for c in columns if c != 'price_in_rp']].copy()
+        listings['price_in_rp'] = price[valid]
+        self.listings_ = listings.reset_index(drop=True)
+        self.source_positions_ = np.flatnonzero(valid)
+
+        # Salinan NumPy untuk penyaringan kandidat tanpa overhead pandas
+        self.bedrooms_ = pd.to_numeric(_column_or_nan(self.listings_, 'bedrooms'),
+                                       errors='coerce').to_numpy(dtype=np.float64)
+        self.building_size_ = pd.to_numeric(_column_or_nan(self.listings_, 'building_size_m2'),
+                                            errors='coerce').to_numpy(dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.price_per_m2_ = np.where(self.building_size_ > 0,
+                                          price[valid] / self.building_size_, np.nan)
+
+        self.tree_ = BallTree(_coordinates(lat[valid], long[valid]),
+                              leaf_size=self.leaf_size, metric='haversine')
+        return self
+
+    def query(self, lat, long, k=5, bedrooms=None, building_size_m2=None, n_candidates=50):
+        """
+        Mencari k listing terdekat yang mirip
+
+        Kandidat diambil dari n_candidates listing terdekat; yang mirip (selisih
+        kamar paling banyak 1, luas bangunan 0.67-1.5 kali) diutamakan, lalu
+        sisanya diisi listing terdekat lainnya.
+
+        Args:
+            lat (float): Lintang
+            long (float): Bujur
+            k (int): Jumlah pembanding
+            bedrooms (float): Jumlah kamar rumah yang dinilai (opsional; None
+                atau NaN melewati filter kamar)
+            building_size_m2 (float): Luas bangunan rumah yang dinilai (opsional;
+                None, 0, atau NaN melewati filter luas)
+            n_candidates (int): Jumlah listing terdekat yang dipertimbangkan
+
+        Returns:
+            pandas.DataFrame: Pembanding terurut menurut kemiripan lalu jarak,
+                dengan kolom distance_km
+        """
+        n_candidates = min(max(n_candidates, k), len(self.listings_))
+        distance, index = self.tree_.query(_coordinates(lat, long), k=n_candidates)
+        distance, index = distance[0], index[0]
+
+        similar = np.ones(n_candidates, dtype=bool)
+        if bedrooms is not None and not np.isnan(bedrooms):
+            similar &= np.abs(self.bedrooms_[index] - bedrooms) <= 1
+        if building_size_m2 and not np.isnan(building_size_m2):
+            ratio = self.building_size_[index] / building_size_m2
+            similar &= (ratio >= 0.67) & (ratio <= 1.5)
+
+        # Urutan stabil: yang mirip dulu, masing-masing tetap terurut menurut jarak
+        order = np.argsort(~similar, kind='stable')[:k]
+        comparables = self.listings_.iloc[index[order]].reset_index(drop=True)
+        comparables['distance_km'] = distance[order] * EARTH_RADIUS_KM
+        return comparables
+
+    def neighborhood_features(self, lat, long, k=10, exclude_self=False):
+        """
+        Fitur agregat lingkungan dari k listing terdekat
+
+        Args:
+            lat (array): Lintang
+            long (array): Bujur
+            k (int): Jumlah tetangga
+            exclude_self (bool): Input adalah data yang dipakai fit(); setiap baris
+                tidak dihitung sebagai tetangganya sendiri (mencegah kebocoran target)
+
+        Returns:
+            pandas.DataFrame: Median harga per m², median log harga, dan rata-rata
+                jarak (km) tetangga; NaN untuk baris tanpa koordinat
+        """
+        coordinates = _coordinates(lat, long)
+        n_rows = len(coordinates)
+        result = pd.DataFrame({
+            'nbr_price_per_m2': np.full(n_rows, np.nan),
+            'nbr_log_price': np.full(n_rows, np.nan),
+            'nbr_distance_km': np.full(n_rows, np.nan)
+        })
+        valid = ~np.isnan(coordinates).any(axis=1)
+        if not valid.any():
+            return result
+
+        n_query = min(k + int(exclude_self), len(self.listings_))
+        distance, index = self.tree_.query(coordinates[valid], k=n_query)
+        if exclude_self:
+            # Geser baris itu sendiri ke kolom terakhir lalu buang kolom itu
+            own = np.flatnonzero(valid)[:, None]
+            is_self = self.source_positions_[index] == own
+            order = np.argsort(is_self, axis=1, kind='stable')[:, :n_query - 1]
+            distance = np.take_along_axis(distance, order, axis=1)
+            index = np.take_along_axis(index, order, axis=1)
+
+        price = self.listings_['price_in_rp'].to_numpy()
+        with warnings.catch_warnings():
+            # Tetangga tanpa luas bangunan menghasilkan median NaN
+            warnings.simplefilter('ignore', RuntimeWarning)
+            result.loc[valid, 'nbr_price_per_m2'] = np.nanmedian(self.price_per_m2_[index], axis=1)
+        result.loc[valid, 'nbr_log_price'] = np.median(np.log1p(price[index]), axis=1)
+        result.loc[valid, 'nbr_distance_km'] = distance.mean(axis=1) * EARTH_RADIUS_KM
+        return result
+
@@ -3,10 +3,13 @@ Modul Preprocessing Data Harga Rumah Jabodetabek
 
 Fungsi-fungsi:
 - load_data(): Memuat dataset
+- optimize_memory(): Memperkecil tipe data (mode ringkas)
 - handle_missing_values(): Menangani missing values
-- feature_engineering(): Rekayasa fitur
+- prepare_data(): Memisahkan fitur dan target
 - split_data(): Memisahkan data training dan testing
+- feature_engineering(): Rekayasa fitur (fit hanya pada data training)
 - scale_data(): Penskalaan fitur
+- memory_report(): Laporan pemakaian memori
 """
 
 import pandas as pd
@@ -14,15 +17,26 @@ import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 
+from sklearn.utils import check_random_state
+
+from src.dataset_cache import load_dataset, optimize_dtypes, raw_memory_usage
+from src.feature_engineering import FeatureEngineer
+
 class DataPreprocessor:
-    def __init__(self, filepath):
+    def __init__(self, filepath, compact=False, max_category_ratio=0.5):
         """
         Inisialisasi preprocessing data
         
         Args:
             filepath (str): Path file dataset
+            compact (bool): Mode ringkas (downcast tipe data termasuk fitur hasil
+                rekayasa, split berbasis indeks, data perantara dilepas)
+            max_category_ratio (float): Rasio nilai unik maksimum agar kolom teks
+                diubah menjadi categorical pada mode ringkas
         """
         self.filepath = filepath
+        self.compact = compact
+        self.max_category_ratio = max_category_ratio
         self.data = None
         self.X = None
         self.y = None
@@ -30,23 +44,54 @@ class DataPreprocessor:
         self.X_test = None
         self.y_train = None
         self.y_test = None
+        self.train_index = None
+        self.test_index = None
         self.scaler = StandardScaler()
+        self.feature_engineer = None
 
-    def load_data(self):
+    def load_data(self, columns=None):
         """
-        Memuat dataset dari file CSV
+        Memuat dataset dari file CSV (melalui cache kolumnar)
+        
+        Args:
+            columns (list): Kolom yang dimuat; None untuk semua kolom
         
         Returns:
             pandas.DataFrame: Dataset yang dimuat
         """
         try:
-            self.data = pd.read_csv(self.filepath)
+            self.data = load_dataset(self.filepath, columns=columns)
             print("Dataset berhasil dimuat")
+            if self.compact:
+                self.optimize_memory()
             return self.data
         except Exception as e:
             print(f"Error memuat dataset: {e}")
             return None
 
+    def optimize_memory(self):
+        """
+        Memperkecil tipe data: downcast numerik dan kolom teks
+        berkardinalitas rendah menjadi categorical
+        
+        Returns:
+            dict: Pemakaian memori dataset sebelum (setara pd.read_csv mentah,
+                tanpa cache bertipe ringkas) dan sesudah (MB)
+        """
+        before = raw_memory_usage(self.data) / 1e6
+        data = optimize_dtypes(self.data)
+
+        for column in data.columns:
+            series = data[column]
+            if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+                if series.nunique() <= self.max_category_ratio * len(series):
+                    data[column] = series.astype('category')
+
+        self.data = data
+        after = self.data.memory_usage(deep=True).sum() / 1e6
+        print(f"Memori dataset: {before:.2f} MB -> {after:.2f} MB")
+        return {'before_mb': before, 'after_mb': after}
+
     def handle_missing_values(self, strategy='mean'):
         """
         Menangani missing values
@@ -61,14 +106,7 @@ class DataPreprocessor:
         elif strategy == 'mode':
             self.data = self.data.fillna(self.data.mode().iloc[0])
 
-    def feature_engineering(self):
-        """
-        Rekayasa fitur tambahan
-        """
-        # Contoh: Menambahkan fitur baru
-        self.data['price_per_sqm'] = self.data['price'] / self.data['luas_bangunan']
-
-    def prepare_data(self, target_column='price'):
+    def prepare_data(self, target_column='price_in_rp'):
         """
         Mempersiapkan data untuk pemodelan
         
@@ -77,6 +115,9 @@ class DataPreprocessor:
         """
         self.X = self.data.drop(target_column, axis=1)
         self.y = self.data[target_column]
+        if self.compact:
+            # X dan y sudah memuat seluruh kolom; salinan data tidak dipakai lagi
+            self.data = None
 
     def split_data(self, test_size=0.2, random_state=42):
         """
@@ -86,9 +127,43 @@ class DataPreprocessor:
             test_size (float): Proporsi data testing
             random_state (int): Seed untuk reproduksibilitas
         """
-        self.X_train, self.X_test, self.y_train, self.y_test = train_test_split(
-            self.X, self.y, test_size=test_size, random_state=random_state
-        )
+        if not self.compact:
+            self.X_train, self.X_test, self.y_train, self.y_test = train_test_split(
+                self.X, self.y, test_size=test_size, random_state=random_state
+            )
+            return
+
+        # Mode ringkas: simpan indeks baris saja, ambil baris training dan
+        # testing sekali, lalu lepaskan X dan y penuh. Urutan permutasi sama
+        # dengan train_test_split sehingga hasil split identik.
+        n_samples = len(self.X)
+        n_test = int(np.ceil(test_size * n_samples))
+        permutation = check_random_state(random_state).permutation(n_samples)
+        self.test_index, self.train_index = permutation[:n_test], permutation[n_test:]
+
+        self.X_test, self.X_train = self.X.take(self.test_index), self.X.take(self.train_index)
+        self.y_test, self.y_train = self.y.take(self.test_index), self.y.take(self.train_index)
+        self.X = None
+        self.y = None
+
+    def feature_engineering(self):
+        """
+        Rekayasa fitur tambahan dengan FeatureEngineer
+
+        Dipanggil setelah split_data(): target encoding district dan indeks
+        pembanding hanya dipelajari dari data training sehingga harga data
+        testing tidak bocor ke fitur.
+        """
+        if self.X_train is None:
+            raise ValueError("Panggil split_data() sebelum feature_engineering()")
+
+        self.feature_engineer = FeatureEngineer()
+        self.X_train = self.feature_engineer.fit_transform(self.X_train, self.y_train)
+        self.X_test = self.feature_engineer.transform(self.X_test)
+        if self.compact:
+            # FeatureEngineer menghasilkan float64
+            self.X_train = optimize_dtypes(self.X_train)
+            self.X_test = optimize_dtypes(self.X_test)
 
     def scale_data(self):
         """
@@ -100,4 +175,22 @@ class DataPreprocessor:
         X_train_scaled = self.scaler.fit_transform(self.X_train)
         X_test_scaled = self.scaler.transform(self.X_test)
         
-        return X_train_scaled, X_test_scaled
\ No newline at end of file
+        return X_train_scaled, X_test_scaled
+
+    def memory_report(self):
+        """
+        Laporan pemakaian memori setiap atribut data
+        
+        Returns:
+            dict: Pemakaian memori per atribut dan totalnya (MB)
+        """
+        report = {}
+        for name in ['data', 'X', 'y', 'X_train', 'X_test', 'y_train', 'y_test']:
+            value = getattr(self, name)
+            if value is not None:
+                usage = value.memory_usage(deep=True)
+                report[name] = (usage.sum() if hasattr(usage, 'sum') else usage) / 1e6
+                print(f"{name}: {report[name]:.2f} MB")
+        report['total'] = sum(report.values())
+        print(f"total: {report['total']:.2f} MB")
+        return report
\ No newline at end of file
@@ -0,0 +1,272 @@
+"""
+Modul Validasi Kualitas Data Harga Rumah
+
+Menyaring baris hasil scraping sebelum training dengan operasi vektor per
+chunk, sehingga dapat dipakai pada DataFrame di memori maupun CSV yang
+dibaca bertahap.
+
+Aturan:
+- Skema: harga dan luas tanah harus numerik dan positif, luas bangunan
+  tidak negatif, jumlah kamar (bila diisi) antara 0 dan MAX_BEDROOMS
+- Duplikat ads_id: hanya kemunculan pertama yang dipertahankan. Di dalam
+  satu chunk deteksinya eksak; antar chunk memakai Bloom filter berukuran
+  tetap (default 9 MB untuk 5 juta ads_id) sehingga memori tidak tumbuh
+  dengan ukuran dataset. Peluang listing unik ikut ditolak sebagai duplikat
+  sekitar 0,1% selama jumlah ads_id tidak melebihi kapasitas
+- Outlier harga per m² tanah (skala log) dengan MAD atau IQR; statistiknya
+  diambil dari QuantileSketch sehingga cukup satu pass
+
+Setiap baris yang ditolak dihitung per alasan untuk laporan penolakan.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.streaming_training import QuantileSketch
+
+REQUIRED_COLUMNS = ['price_in_rp', 'land_size_m2']
+MAX_BEDROOMS = 50
+
+# Urutan alasan penolakan; baris dihitung pada alasan pertama yang cocok
+REASONS = ['invalid_price', 'invalid_land_size', 'invalid_building_size', 'invalid_bedrooms',
+           'duplicate_ads_id', 'price_per_m2_outlier']
+
+
+def _numeric(data, name):
+    """
+    Kolom numerik; nilai tidak valid dan kolom yang tidak ada menjadi NaN
+    """
+    if name not in data.columns:
+        return np.full(len(data), np.nan)
+    return pd.to_numeric(data[name], errors='coerce').to_numpy(dtype=np.float64)
+
+
+class BloomFilter:
+    def __init__(self, capacity=5_000_000, error_rate=0.001):
+        """
+        Himpunan perkiraan dengan memori tetap (tanpa false negative)
+
+        Args:
+            capacity (int): Jumlah item yang diharapkan
+            error_rate (float): Peluang false positive pada kapasitas penuh
+        """
+        n_bits = int(np.ceil(-capacity * np.log(error_rate) / np.log(2) ** 2))
+        self.n_bits = (n_bits + 7) // 8 * 8
+        self.n_hashes = max(1, int(round(self.n_bits / capacity * np.log(2))))
+        self.bits = np.zeros(self.n_bits // 8, dtype=np.uint8)
+
+    def _positions(self, values):
+        """
+        Posisi bit setiap nilai (double hashing dari dua hash 64-bit)
+        """
+        values = pd.Series(values, dtype='string')
+        h1 = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        h2 = pd.util.hash_pandas_object(values, index=False,
+                                        hash_key='bloomfilterkey02').to_numpy() | np.uint64(1)
+        steps = np.arange(self.n_hashes, dtype=np.uint64)
+        return (h1[:, None] + steps * h2[:, None]) % np.uint64(self.n_bits)
+
+    def contains(self, values):
+        """
+        Mask nilai yang mungkin sudah pernah ditambahkan
+
+        Args:
+            values (array): Nilai (diubah menjadi string)
+
+        Returns:
+            numpy.ndarray: Mask boolean
+        """
+        positions = self._positions(values)
+        masks = (1 << (positions & np.uint64(7))).astype(np.uint8)
+        return (self.bits[positions >> np.uint64(3)] & masks).all(axis=1)
+
+    def add(self, values):
+        """
+        Menambahkan nilai
+
+        Args:
+            values (array): Nilai (diubah menjadi string)
+        """
+        positions = self._positions(values).ravel()
+        np.bitwise_or.at(self.bits, positions >> np.uint64(3),
+                         (1 << (positions & np.uint64(7))).astype(np.uint8))
+
+
+class DataQualityFilter:
+    def __init__(self, method='mad', threshold=3.5, iqr_factor=1.5, sketch_capacity=2000,
+                 id_capacity=5_000_000):
+        """
+        Inisialisasi filter kualitas data
+
+        Args:
+            method (str): 'mad' (median absolute deviation) atau 'iqr'
+            threshold (float): Batas skor-z robust untuk metode MAD
+            iqr_factor (float): Pengali IQR untuk metode IQR
+            sketch_capacity (int): Kapasitas QuantileSketch
+            id_capacity (int): Jumlah ads_id yang diharapkan untuk Bloom filter
+                deteksi duplikat antar chunk
+        """
+        if method not in ('mad', 'iqr'):
+            raise ValueError(f"Metode outlier tidak dikenal: {method}")
+        self.method = method
+        self.threshold = threshold
+        self.iqr_factor = iqr_factor
+        self.sketch = QuantileSketch(sketch_capacity)
+        self.bounds_ = None
+        self.counts = None
+        self.n_rows = 0
+        self.id_capacity = id_capacity
+        self._seen_ids = None
+        self.start_pass()
+
+    def start_pass(self):
+        """
+        Mengosongkan laporan dan daftar ads_id untuk pass baru atas data
+        """
+        self.counts = dict.fromkeys(REASONS, 0)
+        self.n_rows = 0
+        self._seen_ids = BloomFilter(self.id_capacity)
+
+    def _schema_reasons(self, data):
+        """
+        Alasan penolakan skema per baris (string kosong untuk baris valid)
+        """
+        missing = [column for column in REQUIRED_COLUMNS if column not in data.columns]
+        if missing:
+            raise ValueError(f"Kolom wajib tidak ditemukan: {missing}")
+
+        price = _numeric(data, 'price_in_rp')
+        land = _numeric(data, 'land_size_m2')
+        building = _numeric(data, 'building_size_m2')
+        bedrooms = _numeric(data, 'bedrooms')
+
+        # np.select memilih alasan pertama yang cocok
+        return np.select(
+            [
+                ~(price > 0),
+                ~(land > 0),
+                building < 0,
+                (bedrooms < 0) | (bedrooms > MAX_BEDROOMS)
+            ],
+            REASONS[:4],
+            default=''
+        ), price, land
+
+    @staticmethod
+    def _log_price_per_m2(price, land):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.log(price / land)
+
+    def fit(self, chunks):
+        """
+        Satu pass untuk menghitung batas outlier harga per m²
+
+        Args:
+            chunks: DataFrame atau iterable chunk DataFrame
+
+        Returns:
+            DataQualityFilter: Objek ini
+        """
+        if isinstance(chunks, pd.DataFrame):
+            chunks = [chunks]
+
+        for chunk in chunks:
+            reasons, price, land = self._schema_reasons(chunk)
+            self.sketch.update(self._log_price_per_m2(price, land)[reasons == ''])
+
+        if self.sketch.count == 0:
+            raise ValueError("Tidak ada baris valid untuk menghitung batas outlier")
+
+        if self.method == 'mad':
+            median = self.sketch.quantile(0.5)
+            # MAD didekati dari centroid sketsa: median berbobot |nilai - median|
+            deviation = np.abs(self.sketch.values - median)
+            order = np.argsort(deviation)
+            cumulative = np.cumsum(self.sketch.weights[order])
+            mad = deviation[order][np.searchsorted(cumulative, cumulative[-1] / 2)]
+            spread = self.threshold * 1.4826 * mad
+            self.bounds_ = (median - spread, median + spread)
+        else:
+            q1, q3 = self.sketch.quantile(0.25), self.sketch.quantile(0.75)
+            spread = self.iqr_factor * (q3 - q1)
+            self.bounds_ = (q1 - spread, q3 + spread)
+        return self
+
+    def mask(self, chunk):
+        """
+        Menilai satu chunk dan memperbarui laporan penolakan
+
+        Args:
+            chunk (pandas.DataFrame): Data mentah
+
+        Returns:
+            numpy.ndarray: Mask boolean baris yang lolos semua aturan
+        """
+        if self.bounds_ is None:
+            raise ValueError("Filter belum di-fit")
+
+        reasons, price, land = self._schema_reasons(chunk)
+
+        if 'ads_id' in chunk.columns:
+            ids = chunk['ads_id'].astype('string')
+            # Listing tanpa ads_id tidak dianggap duplikat satu sama lain
+            present = ids.notna().to_numpy()
+            repeated = ids.duplicated().to_numpy()
+            ids = ids.to_numpy(dtype=object)
+            seen = np.zeros(len(ids), dtype=bool)
+            seen[present] = self._seen_ids.contains(ids[present])
+            duplicate = present & (repeated | seen)
+            reasons = np.where((reasons == '') & duplicate, 'duplicate_ads_id', reasons)
+            self._seen_ids.add(ids[present & (reasons == '')])
+
+        log_ppm = self._log_price_per_m2(price, land)
+        low, high = self.bounds_
+        outlier = (log_ppm < low) | (log_ppm > high)
+        reasons = np.where((reasons == '') & outlier, 'price_per_m2_outlier', reasons)
+
+        rejected, counts = np.unique(reasons[reasons != ''], return_counts=True)
+        for reason, count in zip(rejected, counts):
+            self.counts[reason] += int(count)
+        self.n_rows += len(chunk)
+
+        return reasons == ''
+
+    def transform(self, chunk):
+        """
+        Menyaring satu chunk dan memperbarui laporan penolakan
+
+        Args:
+            chunk (pandas.DataFrame): Data mentah
+
+        Returns:
+            pandas.DataFrame: Baris yang lolos semua aturan
+        """
+        return chunk[self.mask(chunk)]
+
+    def fit_transform(self, data):
+        """
+        Fit lalu transform untuk DataFrame di memori
+
+        Args:
+            data (pandas.DataFrame): Data mentah
+
+        Returns:
+            pandas.DataFrame: Baris bersih
+        """
+        self.start_pass()
+        return self.fit(data).transform(data)
+
+    def report(self):
+        """
+        Laporan penolakan ringkas
+
+        Returns:
+            pandas.DataFrame: Jumlah dan persentase baris per alasan, ditambah
+                baris total yang ditolak dan dipertahankan
+        """
+        rejected = sum(self.counts.values())
+        rows = [(reason, count) for reason, count in self.counts.items() if count]
+        rows += [('total_rejected', rejected), ('kept', self.n_rows - rejected)]
+        report = pd.DataFrame(rows, columns=['reason', 'rows'])
+        report['percent'] = (report['rows'] / max(self.n_rows, 1) * 100).round(2)
+        return report
@@ -0,0 +1,195 @@
+"""
+Modul Cache Dataset Harga Rumah
+
+Mengonversi CSV mentah sekali menjadi file kolumnar bertipe ringkas
+sehingga pemuatan berikutnya tidak perlu mem-parsing ulang CSV.
+
+Fungsi-fungsi:
+- optimize_dtypes(): Mengubah kolom ke tipe data ringkas
+- raw_memory_usage(): Perkiraan memori dataset bila dimuat langsung dari CSV
+- source_hash(): Hash isi file sumber (dengan memo mtime/ukuran)
+- source_key(): Kunci cache dari path absolut file sumber
+- load_dataset(): Memuat dataset dari cache, membuat cache bila perlu
+"""
+
+import glob
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from src.model_registry import atomic_write
+
+CACHE_DIR = '.dataset_cache'
+
+# Kolom teks berkardinalitas rendah yang disimpan sebagai categorical
+CATEGORY_COLUMNS = [
+    'district', 'city', 'certificate', 'property_type', 'property_condition',
+    'building_orientation', 'furnishing'
+]
+
+# Kolom numerik yang tetap float64 (harga melebihi presisi float32)
+FLOAT64_COLUMNS = ['price_in_rp']
+
+
+def _has_pyarrow():
+    """
+    Mengecek ketersediaan pyarrow untuk format Parquet
+    """
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def optimize_dtypes(df):
+    """
+    Mengubah kolom dataset ke tipe data ringkas
+
+    Args:
+        df (pandas.DataFrame): Dataset mentah
+
+    Returns:
+        pandas.DataFrame: Dataset dengan categorical, integer kecil, dan float32
+    """
+    df = df.copy()
+    for column in df.columns:
+        series = df[column]
+        if column in CATEGORY_COLUMNS:
+            df[column] = series.astype('category')
+        elif column in FLOAT64_COLUMNS:
+            continue
+        elif pd.api.types.is_integer_dtype(series):
+            df[column] = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series):
+            df[column] = series.astype('float32')
+    return df
+
+
+def raw_memory_usage(df):
+    """
+    Perkiraan memori dataset bila dimuat langsung dengan pd.read_csv
+
+    Kolom numerik dihitung 8 byte per nilai (int64/float64) dan kolom
+    categorical dikembalikan ke tipe teks asalnya satu per satu, sehingga
+    tidak perlu mem-parsing ulang CSV.
+
+    Args:
+        df (pandas.DataFrame): Dataset bertipe ringkas
+
+    Returns:
+        int: Pemakaian memori dalam byte
+    """
+    total = df.index.memory_usage()
+    for column in df.columns:
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            total += series.astype(series.cat.categories.dtype).memory_usage(deep=True, index=False)
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            total += 8 * len(series)
+        else:
+            total += series.memory_usage(deep=True, index=False)
+    return int(total)
+
+
+def source_hash(filepath, cache_dir=CACHE_DIR):
+    """
+    Menghitung hash isi file sumber
+
+    Hash disimpan bersama mtime dan ukuran file sehingga file hanya
+    dibaca ulang bila berubah. Memo yang rusak dianggap kosong.
+
+    Args:
+        filepath (str): Path file sumber
+        cache_dir (str): Direktori cache
+
+    Returns:
+        str: Hash SHA-256 (16 karakter pertama)
+    """
+    stat = os.stat(filepath)
+    memo_path = os.path.join(cache_dir, 'hashes.json')
+    try:
+        with open(memo_path) as f:
+            memo = json.load(f)
+    except (OSError, ValueError):
+        memo = {}
+    if not isinstance(memo, dict):
+        memo = {}
+
+    key = os.path.abspath(filepath)
+    entry = memo.get(key)
+    if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+        return entry['hash']
+
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    file_hash = digest.hexdigest()[:16]
+
+    memo[key] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'hash': file_hash}
+    with atomic_write(memo_path) as tmp_path, open(tmp_path, 'w') as f:
+        json.dump(memo, f)
+    return file_hash
+
+
+def source_key(filepath):
+    """
+    Kunci cache untuk file sumber
+
+    Berbasis path absolut sehingga dua file bernama sama di direktori
+    berbeda (misalnya app/ dan data/) memiliki cache masing-masing.
+
+    Args:
+        filepath (str): Path file sumber
+
+    Returns:
+        str: Nama file tanpa ekstensi diikuti hash path absolut
+    """
+    stem = os.path.splitext(os.path.basename(filepath))[0]
+    path_hash = hashlib.sha256(os.path.abspath(filepath).encode()).hexdigest()[:8]
+    return f'{stem}-{path_hash}'
+
+
+def load_dataset(filepath, columns=None, cache_dir=CACHE_DIR):
+    """
+    Memuat dataset melalui cache kolumnar
+
+    Args:
+        filepath (str): Path file CSV sumber
+        columns (list): Kolom yang dimuat; None untuk semua kolom
+        cache_dir (str): Direktori cache
+
+    Returns:
+        pandas.DataFrame: Dataset bertipe ringkas
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    key = source_key(filepath)
+    extension = '.parquet' if _has_pyarrow() else '.pkl'
+    cache_path = os.path.join(cache_dir, f'{key}-{source_hash(filepath, cache_dir)}{extension}')
+
+    if not os.path.exists(cache_path):
+        # Hapus cache lama dari file sumber yang sama (path yang sama)
+        for old_path in glob.glob(os.path.join(cache_dir, f'{glob.escape(key)}-*{extension}')):
+            try:
+                os.remove(old_path)
+            except FileNotFoundError:
+                pass
+
+        # Ditulis ke file sementara lalu diganti atomik: proses lain (service,
+        # Streamlit) tidak pernah membaca cache yang baru setengah ditulis
+        df = optimize_dtypes(pd.read_csv(filepath))
+        with atomic_write(cache_path) as tmp_path:
+            if extension == '.parquet':
+                df.to_parquet(tmp_path, index=False)
+            else:
+                df.to_pickle(tmp_path)
+        print(f"Cache dataset dibuat di {cache_path}")
+
+    if extension == '.parquet':
+        return pd.read_parquet(cache_path, columns=columns)
+
+    df = pd.read_pickle(cache_path)
+    return df if columns is None else df[columns]
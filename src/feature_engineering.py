@@ -0,0 +1,256 @@
+"""
+Modul Rekayasa Fitur Harga Rumah
+
+Membentuk fitur numerik dari kolom dataset Jabodetabek dengan operasi
+vektor pandas/NumPy (tanpa loop apply). State hasil fit (daftar kota,
+encoding district, kosakata fasilitas) disimpan di objek sehingga
+inferensi memakai transformasi yang sama.
+
+Fitur yang dihasilkan:
+- Kolom numerik langsung (luas, kamar, lantai, umur bangunan, lat/long, ...)
+- Daya listrik dari teks seperti "4400 mah"
+- One-hot kota
+- Target encoding district (rata-rata log harga dengan smoothing; baris
+  training memakai encoding out-of-fold)
+- Multi-hot fasilitas terpopuler
+- Agregat lingkungan dari k listing training terdekat (lat/long, BallTree)
+
+Kolom mentah yang tidak tersedia saat inferensi dianggap missing value.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.comparables import ComparableIndex
+
+NUMERIC_COLUMNS = [
+    'land_size_m2', 'building_size_m2', 'bedrooms', 'bathrooms', 'floors',
+    'building_age', 'carports', 'garages', 'maid_bedrooms', 'maid_bathrooms',
+    'lat', 'long'
+]
+
+TEXT_COLUMNS = ['electricity', 'city', 'district', 'facilities']
+
+# Jumlah fold encoding district out-of-fold untuk baris training
+TARGET_ENCODING_FOLDS = 5
+
+
+def parse_electricity(series):
+    """
+    Mengambil daya listrik (VA) dari teks seperti "4400 mah"
+
+    Args:
+        series (pandas.Series): Kolom electricity
+
+    Returns:
+        pandas.Series: Daya listrik; NaN untuk nilai seperti "lainnya mah"
+    """
+    return pd.to_numeric(
+        series.astype('string').str.extract(r'(\d+)', expand=False), errors='coerce'
+    ).astype('float64')
+
+
+def normalize_facilities(series):
+    """
+    Menormalkan daftar fasilitas menjadi teks huruf kecil dipisah koma
+
+    Args:
+        series (pandas.Series): Kolom facilities
+
+    Returns:
+        pandas.Series: Fasilitas ternormalisasi
+    """
+    return (
+        series.astype('string').fillna('')
+        .str.lower()
+        .str.replace(r'\s*,\s*', ',', regex=True)
+        .str.strip(' ,')
+    )
+
+
+def _column(data, name):
+    """
+    Mengambil kolom; kolom yang tidak ada dianggap missing value seluruhnya
+    """
+    if name in data.columns:
+        return data[name]
+    return pd.Series(np.nan, index=data.index, dtype='object')
+
+
+def _text(data, name):
+    """
+    Mengambil kolom teks tanpa spasi di awal/akhir (misalnya " Bekasi")
+    """
+    return _column(data, name).astype('string').str.strip()
+
+
+class FeatureEngineer:
+    def __init__(self, top_facilities=20, smoothing=10, n_neighbors=10):
+        """
+        Inisialisasi rekayasa fitur
+
+        Args:
+            top_facilities (int): Jumlah fasilitas terpopuler yang dijadikan fitur
+            smoothing (float): Bobot rata-rata global pada target encoding district
+            n_neighbors (int): Jumlah tetangga untuk fitur lingkungan (0 untuk menonaktifkan)
+        """
+        self.top_facilities = top_facilities
+        self.smoothing = smoothing
+        self.n_neighbors = n_neighbors
+        self.comparables_ = None
+        self.cities_ = None
+        self.district_encoding_ = None
+        self.district_default_ = None
+        self.facilities_ = None
+        self.feature_names_ = None
+
+    @property
+    def input_columns(self):
+        """
+        Kolom mentah yang dibaca oleh transform()
+
+        Returns:
+            list: Nama kolom
+        """
+        return NUMERIC_COLUMNS + TEXT_COLUMNS
+
+    def fit(self, data, y=None):
+        """
+        Mempelajari state fitur dari data training
+
+        Args:
+            data (pandas.DataFrame): Data mentah
+            y (array): Harga; dibutuhkan untuk target encoding district
+
+        Returns:
+            FeatureEngineer: Objek ini
+        """
+        self.cities_ = sorted(_text(data, 'city').dropna().unique())
+
+        if y is not None:
+            log_price = pd.Series(np.log1p(np.asarray(y, dtype=np.float64)), index=data.index)
+            stats = log_price.groupby(_text(data, 'district')).agg(['sum', 'count'])
+            self.district_default_ = float(log_price.mean())
+            self.district_encoding_ = (
+                (stats['sum'] + self.smoothing * self.district_default_)
+                / (stats['count'] + self.smoothing)
+            ).to_dict()
+
+            if self.n_neighbors and 'lat' in data.columns and 'long' in data.columns:
+                self.comparables_ = ComparableIndex().fit(data, y)
+
+        facilities = normalize_facilities(_column(data, 'facilities')).str.get_dummies(sep=',')
+        counts = facilities.sum().sort_values(ascending=False, kind='stable')
+        self.facilities_ = list(counts.index[:self.top_facilities])
+
+        self.feature_names_ = list(self.transform(data.iloc[:0]).columns)
+        return self
+
+    def transform(self, data):
+        """
+        Membentuk matriks fitur numerik
+
+        Args:
+            data (pandas.DataFrame): Data mentah
+
+        Returns:
+            pandas.DataFrame: Fitur numerik (missing value dibiarkan NaN)
+        """
+        return self._transform(data)
+
+    def _transform(self, data, training=False):
+        """
+        Membentuk matriks fitur numerik
+
+        Args:
+            data (pandas.DataFrame): Data mentah
+            training (bool): Data sama dengan data fit(); fitur lingkungan tidak
+                memakai baris itu sendiri sebagai tetangga
+
+        Returns:
+            pandas.DataFrame: Fitur numerik
+        """
+        features = {}
+        for column in NUMERIC_COLUMNS:
+            features[column] = pd.to_numeric(_column(data, column), errors='coerce').astype('float64')
+
+        features['electricity_va'] = parse_electricity(_column(data, 'electricity'))
+
+        city = _text(data, 'city')
+        for name in self.cities_:
+            features[f'city_{name}'] = (city == name).fillna(False).astype('float64')
+
+        if self.district_encoding_ is not None:
+            features['district_price_level'] = (
+                _text(data, 'district').astype('object').map(self.district_encoding_)
+                .astype('float64').fillna(self.district_default_)
+            )
+
+        facilities = normalize_facilities(_column(data, 'facilities')).str.get_dummies(sep=',')
+        facilities = facilities.reindex(columns=self.facilities_, fill_value=0)
+        for name in self.facilities_:
+            features[f'facility_{name}'] = facilities[name].astype('float64')
+
+        # Pipeline lama (sebelum fitur lingkungan) tidak memiliki atribut ini
+        comparables = getattr(self, 'comparables_', None)
+        if comparables is not None:
+            neighborhood = comparables.neighborhood_features(
+                _column(data, 'lat'), _column(data, 'long'), self.n_neighbors,
+                exclude_self=training
+            )
+            for column in neighborhood.columns:
+                features[column] = neighborhood[column].to_numpy()
+
+        return pd.DataFrame(features, index=data.index)
+
+    def fit_transform(self, data, y=None):
+        """
+        Fit lalu transform
+
+        Args:
+            data (pandas.DataFrame): Data mentah
+            y (array): Harga
+
+        Returns:
+            pandas.DataFrame: Fitur numerik
+        """
+        features = self.fit(data, y)._transform(data, training=True)
+        if self.district_encoding_ is not None and y is not None:
+            features['district_price_level'] = self._district_out_of_fold(data, y)
+        return features
+
+    def _district_out_of_fold(self, data, y, random_state=42):
+        """
+        Target encoding district untuk baris training secara out-of-fold
+
+        Listing baru tidak pernah ikut dalam encoding district-nya, sehingga
+        baris training juga tidak boleh (seperti exclude_self pada fitur
+        lingkungan). Setiap fold di-encode dari fold lainnya; dibanding
+        leave-one-out, encoding tidak berkorelasi negatif dengan harga baris
+        itu sendiri.
+
+        Args:
+            data (pandas.DataFrame): Data mentah yang sama dengan fit()
+            y (array): Harga
+            random_state (int): Seed pembagian fold
+
+        Returns:
+            numpy.ndarray: Encoding district per baris
+        """
+        log_price = pd.Series(np.log1p(np.asarray(y, dtype=np.float64)))
+        district = _text(data, 'district').astype('object').reset_index(drop=True)
+        folds = np.random.RandomState(random_state).permutation(len(data)) % TARGET_ENCODING_FOLDS
+
+        encoding = np.full(len(data), self.district_default_)
+        for fold in range(TARGET_ENCODING_FOLDS):
+            held_out = folds == fold
+            stats = log_price[~held_out].groupby(district[~held_out]).agg(['sum', 'count'])
+            level = (
+                (stats['sum'] + self.smoothing * self.district_default_)
+                / (stats['count'] + self.smoothing)
+            )
+            encoding[held_out] = (
+                district[held_out].map(level).astype('float64')
+                .fillna(self.district_default_).to_numpy()
+            )
+        return encoding
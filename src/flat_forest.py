@@ -0,0 +1,404 @@
+"""
+Modul Forest Datar (Array-Backed)
+
+Menyimpan seluruh pohon RandomForest/ExtraTrees sebagai beberapa array
+NumPy datar (indeks anak, fitur, ambang, nilai daun) sehingga artefak
+dapat dimuat dengan joblib.load(..., mmap_mode='r'). Berbeda dengan objek
+Tree sklearn yang menyalin node saat unpickle, array ini dipetakan langsung
+dari page cache dan dipakai bersama oleh semua proses worker.
+
+Prediksi dilakukan dengan penelusuran pohon tervektorisasi NumPy dan
+menghasilkan nilai yang sama persis dengan sklearn.
+
+CompactForest adalah format ringkasnya: ambang float32, indeks anak lokal
+int16/int32, fitur int8, serta node internal dan daun yang dipisah sehingga
+setiap node hanya menyimpan field yang dipakai.
+"""
+
+import numpy as np
+
+TREE_LEAF = -1
+
+# Jumlah baris yang ditelusuri sekaligus (membatasi memori array node)
+BLOCK_SIZE = 4096
+
+
+class _LeafAverageEnsemble:
+    """
+    Prediksi rata-rata daun bersama untuk FlatForest dan CompactForest
+    """
+
+    def predict(self, X):
+        """
+        Memprediksi rata-rata nilai daun semua pohon
+
+        Args:
+            X (array): Fitur terstandardisasi berbentuk (n_sampel, n_fitur)
+
+        Returns:
+            numpy.ndarray: Prediksi
+        """
+        # Sama seperti sklearn: input dibandingkan sebagai float32
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(
+                f"Jumlah fitur {X.shape[1]} tidak sesuai, seharusnya {self.n_features}"
+            )
+
+        prediction = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], BLOCK_SIZE):
+            leaves = self.value[self.apply(X[start:start + BLOCK_SIZE])]
+
+            # Dijumlah berurutan per pohon agar identik dengan sklearn
+            block = leaves[:, 0].astype(np.float64)
+            for i in range(1, self.n_trees):
+                block += leaves[:, i]
+            prediction[start:start + BLOCK_SIZE] = block / self.n_trees
+        return prediction
+
+
+class FlatForest(_LeafAverageEnsemble):
+    def __init__(self, children_left, children_right, feature, threshold, value, roots,
+                 n_features):
+        """
+        Inisialisasi forest datar
+
+        Args:
+            children_left (array): Indeks global anak kiri tiap node (-1 untuk daun)
+            children_right (array): Indeks global anak kanan tiap node
+            feature (array): Indeks fitur pemisah tiap node
+            threshold (array): Ambang pemisah tiap node
+            value (array): Nilai prediksi tiap node
+            roots (array): Indeks node akar tiap pohon
+            n_features (int): Jumlah fitur input
+        """
+        self.children_left = children_left
+        self.children_right = children_right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.roots = roots
+        self.n_features = n_features
+
+    @staticmethod
+    def supports(model):
+        """
+        Mengecek apakah model dapat diubah menjadi FlatForest
+
+        Args:
+            model: Model terlatih
+
+        Returns:
+            bool: True untuk ensemble rata-rata pohon regresi satu output
+        """
+        estimators = getattr(model, 'estimators_', None)
+        return (
+            isinstance(estimators, list)
+            and bool(estimators)
+            and getattr(model, 'n_outputs_', 1) == 1
+            and all(hasattr(est, 'tree_') for est in estimators)
+        )
+
+    @classmethod
+    def from_estimator(cls, model):
+        """
+        Mengubah RandomForestRegressor/ExtraTreesRegressor menjadi array datar
+
+        Args:
+            model: Ensemble pohon terlatih
+
+        Returns:
+            FlatForest: Forest datar
+        """
+        if not cls.supports(model):
+            raise ValueError(f"Model {type(model).__name__} tidak dapat diubah menjadi FlatForest")
+
+        trees = [est.tree_ for est in model.estimators_]
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+
+        def concat_children(attribute):
+            parts = []
+            for tree, offset in zip(trees, offsets):
+                children = getattr(tree, attribute).astype(np.int64)
+                parts.append(np.where(children == TREE_LEAF, TREE_LEAF, children + offset))
+            return np.concatenate(parts)
+
+        return cls(
+            children_left=concat_children('children_left'),
+            children_right=concat_children('children_right'),
+            feature=np.concatenate([tree.feature for tree in trees]).astype(np.int64),
+            threshold=np.concatenate([tree.threshold for tree in trees]),
+            value=np.concatenate([tree.value[:, 0, 0] for tree in trees]),
+            roots=offsets[:-1].astype(np.int64),
+            n_features=int(model.n_features_in_)
+        )
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def node_count(self):
+        return len(self.children_left)
+
+    @property
+    def nbytes(self):
+        """
+        Ukuran total array node dalam byte
+        """
+        return sum(
+            getattr(self, name).nbytes
+            for name in ('children_left', 'children_right', 'feature', 'threshold', 'value',
+                         'roots')
+        )
+
+    def apply(self, X):
+        """
+        Mencari indeks daun setiap baris di setiap pohon
+
+        Args:
+            X (numpy.ndarray): Fitur float32 berbentuk (n_sampel, n_fitur)
+
+        Returns:
+            numpy.ndarray: Indeks daun global berbentuk (n_sampel, n_pohon)
+        """
+        n_rows = X.shape[0]
+        nodes = np.broadcast_to(self.roots, (n_rows, self.n_trees)).ravel().copy()
+        rows = np.repeat(np.arange(n_rows), self.n_trees)
+
+        # Hanya pasangan (baris, pohon) yang belum mencapai daun yang diproses
+        active = np.arange(nodes.size)
+        while active.size:
+            node = nodes[active]
+            left = self.children_left[node]
+            internal = left != TREE_LEAF
+            active, node, left = active[internal], node[internal], left[internal]
+
+            go_left = X[rows[active], self.feature[node]] <= self.threshold[node]
+            nodes[active] = np.where(go_left, left, self.children_right[node])
+
+        return nodes.reshape(n_rows, self.n_trees)
+
+
+def _index_dtype(max_value):
+    """
+    Tipe integer bertanda terkecil yang dapat menampung max_value
+    """
+    for dtype in (np.int8, np.int16, np.int32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+class CompactForest(_LeafAverageEnsemble):
+    def __init__(self, children_left, children_right, feature, threshold, value, root_codes,
+                 internal_offsets, leaf_offsets, n_features):
+        """
+        Inisialisasi forest ringkas
+
+        Node internal dan daun disimpan terpisah. Kode anak >= 0 adalah indeks
+        lokal node internal di pohon yang sama; kode < 0 menunjuk daun
+        ke -(kode + 1). Dengan indeks lokal, int16 cukup untuk pohon hingga
+        32767 node internal.
+
+        Args:
+            children_left (array): Kode anak kiri tiap node internal
+            children_right (array): Kode anak kanan tiap node internal
+            feature (array): Indeks fitur pemisah tiap node internal
+            threshold (array): Ambang float32 tiap node internal
+            value (array): Nilai prediksi tiap daun
+            root_codes (array): Kode node akar tiap pohon
+            internal_offsets (array): Posisi node internal pertama tiap pohon
+            leaf_offsets (array): Posisi daun pertama tiap pohon
+            n_features (int): Jumlah fitur input
+        """
+        self.children_left = children_left
+        self.children_right = children_right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.root_codes = root_codes
+        self.internal_offsets = internal_offsets
+        self.leaf_offsets = leaf_offsets
+        self.n_features = n_features
+
+    @classmethod
+    def from_flat(cls, flat, value_dtype=np.float64):
+        """
+        Meringkas FlatForest
+
+        Ambang float64 dibulatkan ke bawah ke float32 terdekat. Karena input
+        selalu dibandingkan sebagai float32, x <= ambang32 setara dengan
+        x <= ambang64, sehingga jalur penelusuran tidak berubah.
+
+        Args:
+            flat (FlatForest): Forest datar
+            value_dtype: Tipe nilai daun; float32 memperkecil artefak dengan
+                galat relatif sekitar 1e-7
+
+        Returns:
+            CompactForest: Forest ringkas
+        """
+        n_nodes = flat.node_count
+        tree_of_node = np.repeat(np.arange(flat.n_trees), np.diff(np.append(flat.roots, n_nodes)))
+        is_leaf = flat.children_left == TREE_LEAF
+
+        # Nomor urut lokal node internal dan daun di dalam pohonnya
+        internal_rank = np.cumsum(~is_leaf) - 1
+        leaf_rank = np.cumsum(is_leaf) - 1
+        internal_offsets = np.append(0, np.cumsum(np.bincount(
+            tree_of_node[~is_leaf], minlength=flat.n_trees)))[:-1]
+        leaf_offsets = np.append(0, np.cumsum(np.bincount(
+            tree_of_node[is_leaf], minlength=flat.n_trees)))[:-1]
+
+        codes = np.where(
+            is_leaf,
+            -(leaf_rank - leaf_offsets[tree_of_node]) - 1,
+            internal_rank - internal_offsets[tree_of_node]
+        )
+        internal = np.flatnonzero(~is_leaf)
+        left_codes = codes[flat.children_left[internal]]
+        right_codes = codes[flat.children_right[internal]]
+        code_limit = max(np.abs(left_codes).max(initial=0), np.abs(right_codes).max(initial=0))
+        code_dtype = _index_dtype(code_limit)
+
+        threshold = flat.threshold[internal]
+        threshold32 = threshold.astype(np.float32)
+        too_high = threshold32.astype(np.float64) > threshold
+        threshold32[too_high] = np.nextafter(threshold32[too_high], np.float32(-np.inf))
+
+        return cls(
+            children_left=left_codes.astype(code_dtype),
+            children_right=right_codes.astype(code_dtype),
+            feature=flat.feature[internal].astype(_index_dtype(flat.n_features)),
+            threshold=threshold32,
+            value=flat.value[is_leaf].astype(value_dtype),
+            root_codes=codes[flat.roots].astype(code_dtype),
+            internal_offsets=internal_offsets.astype(np.int64),
+            leaf_offsets=leaf_offsets.astype(np.int64),
+            n_features=flat.n_features
+        )
+
+    @classmethod
+    def from_estimator(cls, model, value_dtype=np.float64):
+        """
+        Mengubah RandomForestRegressor/ExtraTreesRegressor menjadi forest ringkas
+
+        Args:
+            model: Ensemble pohon terlatih
+            value_dtype: Tipe nilai daun
+
+        Returns:
+            CompactForest: Forest ringkas
+        """
+        return cls.from_flat(FlatForest.from_estimator(model), value_dtype)
+
+    def to_flat(self):
+        """
+        Mengembalikan forest ringkas ke format datar
+
+        Ambang float32 dipakai apa adanya sehingga jalur penelusuran sama
+        persis dengan forest ringkas ini.
+
+        Returns:
+            FlatForest: Forest datar; node setiap pohon berurutan (node
+                internal lalu daun)
+        """
+        n_internal, n_leaves = len(self.children_left), len(self.value)
+        internal_counts = np.diff(np.append(self.internal_offsets, n_internal))
+        tree_of_internal = np.repeat(np.arange(self.n_trees), internal_counts)
+        node_offsets = self.internal_offsets + self.leaf_offsets
+
+        def to_global(codes, trees):
+            codes = codes.astype(np.int64)
+            return np.where(codes >= 0, node_offsets[trees] + codes,
+                            node_offsets[trees] + internal_counts[trees] - codes - 1)
+
+        n_nodes = n_internal + n_leaves
+        internal = to_global(np.arange(n_internal) - self.internal_offsets[tree_of_internal],
+                             tree_of_internal)
+        tree_of_leaf = np.repeat(np.arange(self.n_trees),
+                                 np.diff(np.append(self.leaf_offsets, n_leaves)))
+        leaves = to_global(-(np.arange(n_leaves) - self.leaf_offsets[tree_of_leaf]) - 1,
+                           tree_of_leaf)
+
+        children_left = np.full(n_nodes, TREE_LEAF, dtype=np.int64)
+        children_right = np.full(n_nodes, TREE_LEAF, dtype=np.int64)
+        feature = np.full(n_nodes, -2, dtype=np.int64)
+        threshold = np.full(n_nodes, -2.0)
+        value = np.zeros(n_nodes)
+        children_left[internal] = to_global(self.children_left, tree_of_internal)
+        children_right[internal] = to_global(self.children_right, tree_of_internal)
+        feature[internal] = self.feature
+        threshold[internal] = self.threshold
+        value[leaves] = self.value
+
+        return FlatForest(children_left, children_right, feature, threshold, value,
+                          to_global(self.root_codes, np.arange(self.n_trees)), self.n_features)
+
+    @property
+    def n_trees(self):
+        return len(self.root_codes)
+
+    @property
+    def nbytes(self):
+        """
+        Ukuran total array node dalam byte
+        """
+        return sum(
+            getattr(self, name).nbytes
+            for name in ('children_left', 'children_right', 'feature', 'threshold', 'value',
+                         'root_codes', 'internal_offsets', 'leaf_offsets')
+        )
+
+    def apply(self, X):
+        """
+        Mencari indeks daun setiap baris di setiap pohon
+
+        Args:
+            X (numpy.ndarray): Fitur float32 berbentuk (n_sampel, n_fitur)
+
+        Returns:
+            numpy.ndarray: Indeks daun global berbentuk (n_sampel, n_pohon)
+        """
+        n_rows = X.shape[0]
+        trees = np.tile(np.arange(self.n_trees), n_rows)
+        node_base = self.internal_offsets[trees]
+        # Posisi awal baris pada X yang diratakan (lebih cepat dari indeks 2D)
+        row_base = np.repeat(np.arange(n_rows) * X.shape[1], self.n_trees)
+        X_flat = X.ravel()
+        codes = self.root_codes.astype(np.int64)[trees]
+
+        active = np.flatnonzero(codes >= 0)
+        while active.size:
+            node = node_base[active] + codes[active]
+            go_left = X_flat[row_base[active] + self.feature[node]] <= self.threshold[node]
+            child = np.where(go_left, self.children_left[node], self.children_right[node])
+            codes[active] = child
+            active = active[child >= 0]
+
+        return (self.leaf_offsets[trees] - codes - 1).reshape(n_rows, self.n_trees)
+
+
+def verify_forest(model, forest, X, rtol=1e-6):
+    """
+    Membandingkan prediksi forest datar/ringkas dengan model sklearn asal
+
+    Args:
+        model: Ensemble pohon sklearn
+        forest: FlatForest atau CompactForest hasil konversi model
+        X (array): Data fitur terstandardisasi untuk verifikasi
+        rtol (float): Galat relatif maksimum yang diterima
+
+    Returns:
+        float: Galat relatif maksimum
+    """
+    expected = model.predict(X)
+    actual = forest.predict(X)
+    error = float(np.max(np.abs(actual - expected) / np.maximum(np.abs(expected), 1e-12),
+                         initial=0.0))
+    if error > rtol:
+        raise ValueError(f"Prediksi forest ringkas menyimpang dari model asal ({error:.2e})")
+    return error
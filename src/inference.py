@@ -0,0 +1,307 @@
+"""
+Modul Inferensi Harga Rumah
+
+Menggabungkan imputer, scaler, dan model menjadi satu artefak pipeline
+berversi. Imputasi median dan standardisasi dilipat menjadi satu langkah
+NumPy yang dihitung sebelumnya, dan untuk model berbasis pohon prediksi
+langsung memanggil struktur pohon sehingga prediksi tidak melewati
+validasi input sklearn di setiap pemanggilan.
+
+Untuk serving, to_flat() mengganti forest sklearn dengan FlatForest yang
+dapat dimuat lewat memory-map dan dipakai bersama antar proses.
+"""
+
+import copy
+import time
+import warnings
+
+import joblib
+import numpy as np
+
+from src.flat_forest import FlatForest
+from src.model_registry import atomic_write
+from src.slim_inference import as_feature_matrix
+
+FORMAT_VERSION = 1
+
+
+class InferencePipeline:
+    def __init__(self, feature_names, fill_values, mean, scale, model, version=None,
+                 feature_engineer=None, n_samples=None):
+        """
+        Inisialisasi pipeline inferensi
+
+        Args:
+            feature_names (list): Urutan nama fitur input
+            fill_values (array): Nilai pengganti missing value per fitur
+            mean (array): Rata-rata fitur untuk standardisasi
+            scale (array): Simpangan baku fitur untuk standardisasi
+            model: Model terlatih (dilatih pada fitur terstandardisasi)
+            version (str): Versi artefak; default berupa timestamp
+            feature_engineer (FeatureEngineer): Tahap rekayasa fitur terlatih
+                untuk input berupa kolom mentah dataset (opsional)
+            n_samples (int): Jumlah baris yang membentuk statistik imputer/scaler
+        """
+        self.format_version = FORMAT_VERSION
+        self.version = version or time.strftime('%Y%m%d%H%M%S')
+        self.feature_names = list(feature_names)
+        self.fill_values = np.asarray(fill_values, dtype=np.float64)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.model = model
+        self.feature_engineer = feature_engineer
+        self.n_samples = n_samples
+        self._prepare()
+
+    @classmethod
+    def from_components(cls, imputer, scaler, model, feature_names=None, version=None,
+                        feature_engineer=None):
+        """
+        Membuat pipeline dari SimpleImputer, StandardScaler, dan model
+
+        Args:
+            imputer (SimpleImputer): Imputer terlatih
+            scaler (StandardScaler): Scaler terlatih
+            model: Model terlatih
+            feature_names (list): Nama fitur; default dari imputer
+            version (str): Versi artefak
+            feature_engineer (FeatureEngineer): Tahap rekayasa fitur (opsional)
+
+        Returns:
+            InferencePipeline: Pipeline gabungan
+        """
+        if feature_names is None:
+            feature_names = getattr(imputer, 'feature_names_in_', None)
+        if feature_names is None:
+            feature_names = [f'x{i}' for i in range(imputer.n_features_in_)]
+
+        n_features = len(feature_names)
+        mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(n_features)
+        scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+
+        n_samples = int(np.max(scaler.n_samples_seen_))
+        return cls(feature_names, imputer.statistics_, mean, scale, model, version,
+                   feature_engineer, n_samples)
+
+    def _prepare(self):
+        """
+        Menghitung ulang state turunan (nilai isi terskala, daftar pohon)
+        """
+        self._fill_scaled = (self.fill_values - self.mean) / self.scale
+
+        # Jalur cepat: panggil Tree.predict langsung tanpa validasi estimator
+        self._trees = None
+        if FlatForest.supports(self.model):
+            self._trees = [est.tree_ for est in self.model.estimators_]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_fill_scaled', None)
+        state.pop('_trees', None)
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault('feature_engineer', None)
+        state.setdefault('n_samples', None)
+        self.__dict__.update(state)
+        self._prepare()
+
+    @property
+    def input_columns(self):
+        """
+        Kolom mentah yang dibutuhkan dari DataFrame input
+
+        Returns:
+            list: Nama kolom
+        """
+        if self.feature_engineer is not None:
+            return self.feature_engineer.input_columns
+        return self.feature_names
+
+    def to_array(self, X):
+        """
+        Mengubah input (DataFrame, dict, atau array) menjadi matriks float64
+
+        Args:
+            X: DataFrame/dict dengan kolom fitur (atau kolom mentah bila ada
+                feature_engineer), atau array berurutan sesuai feature_names
+
+        Returns:
+            numpy.ndarray: Matriks fitur 2D
+        """
+        if self.feature_engineer is not None and isinstance(X, dict):
+            import pandas as pd
+            X = pd.DataFrame({name: np.atleast_1d(value) for name, value in X.items()})
+
+        if hasattr(X, 'columns') and self.feature_engineer is not None:
+            X = self.feature_engineer.transform(X)
+
+        return as_feature_matrix(X, self.feature_names)
+
+    def transform(self, X):
+        """
+        Imputasi dan standardisasi dalam satu langkah vektor
+
+        Args:
+            X: Data fitur mentah
+
+        Returns:
+            numpy.ndarray: Fitur terstandardisasi
+        """
+        X = self.to_array(X)
+        return np.where(np.isnan(X), self._fill_scaled, (X - self.mean) / self.scale)
+
+    def predict(self, X):
+        """
+        Memprediksi harga rumah
+
+        Args:
+            X: Data fitur mentah
+
+        Returns:
+            numpy.ndarray: Prediksi harga
+        """
+        return self.predict_transformed(self.transform(X))
+
+    def predict_transformed(self, X_scaled):
+        """
+        Memprediksi harga dari fitur yang sudah melalui transform()
+
+        Args:
+            X_scaled (numpy.ndarray): Fitur terstandardisasi
+
+        Returns:
+            numpy.ndarray: Prediksi harga
+        """
+        if self._trees is None:
+            return self.model.predict(X_scaled)
+
+        X_tree = np.ascontiguousarray(X_scaled, dtype=np.float32)
+        prediction = np.zeros(X_tree.shape[0], dtype=np.float64)
+        for tree in self._trees:
+            prediction += tree.predict(X_tree)[:, 0]
+        prediction /= len(self._trees)
+        return prediction
+
+    def set_model(self, model, version=None):
+        """
+        Mengganti model (misalnya setelah pelatihan inkremental) dengan versi baru
+
+        Args:
+            model: Model terlatih
+            version (str): Versi artefak baru; default berupa timestamp
+        """
+        self.model = model
+        self.version = version or time.strftime('%Y%m%d%H%M%S')
+        self._prepare()
+
+    def update_statistics(self, X_new):
+        """
+        Memperbarui statistik imputer dan scaler secara inkremental
+
+        Rata-rata dan varians digabung secara eksak (rumus Chan); median
+        didekati dengan rata-rata berbobot median lama dan median batch baru.
+        Untuk model linear (memiliki coef_ dan intercept_) koefisien, dan
+        batas pemotongan fitur bila ada, disesuaikan sehingga fungsi
+        prediksi terhadap fitur mentah tidak berubah. Model berbasis pohon menyimpan ambang di ruang skala lama,
+        sehingga statistiknya harus dibiarkan tetap.
+
+        Args:
+            X_new: Data fitur mentah baru
+
+        Returns:
+            InferencePipeline: Objek ini
+        """
+        if self.n_samples is None:
+            raise ValueError("Jumlah sampel statistik lama tidak diketahui")
+        if self._trees is not None or not hasattr(self.model, 'coef_'):
+            raise ValueError("Statistik hanya dapat diperbarui untuk model linear")
+
+        X_new = self.to_array(X_new)
+        n_old, n_new = self.n_samples, X_new.shape[0]
+        n_total = n_old + n_new
+
+        # Median didekati per fitur dari baris yang tidak kosong
+        observed = ~np.isnan(X_new)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            new_median = np.nanmedian(X_new, axis=0)
+        has_new = observed.any(axis=0)
+        fill_values = self.fill_values.copy()
+        fill_values[has_new] = (
+            n_old * self.fill_values[has_new] + n_new * new_median[has_new]
+        ) / n_total
+
+        # Rata-rata dan varians digabung setelah imputasi (seperti StandardScaler)
+        X_imputed = np.where(observed, X_new, self.fill_values)
+        new_mean = X_imputed.mean(axis=0)
+        new_var = X_imputed.var(axis=0)
+        old_var = self.scale ** 2
+        delta = new_mean - self.mean
+        mean = self.mean + delta * n_new / n_total
+        var = (n_old * old_var + n_new * new_var + delta ** 2 * n_old * n_new / n_total) / n_total
+        scale = np.where(var > 0, np.sqrt(var), 1.0)
+
+        # f(x) = b + sum(w * (x - m) / s) dipertahankan untuk m, s yang baru
+        coef = np.asarray(self.model.coef_, dtype=np.float64)
+        self.model.intercept_ = self.model.intercept_ + np.sum(coef * (mean - self.mean) / self.scale)
+        self.model.coef_ = coef * scale / self.scale
+
+        # Batas pemotongan dipertahankan di ruang fitur mentah: ±c pada skala
+        # lama menjadi batas per fitur (tidak simetris) pada skala baru
+        bounds = self.model.clip_bounds() if hasattr(self.model, 'clip_bounds') else None
+        if bounds is not None:
+            lower, upper = (
+                (self.mean + np.asarray(bound, dtype=np.float64) * self.scale - mean) / scale
+                for bound in bounds
+            )
+            self.model.clip_bounds_ = (lower, upper)
+
+        self.fill_values = fill_values
+        self.mean = mean
+        self.scale = scale
+        self.n_samples = n_total
+        self._prepare()
+        return self
+
+    def to_flat(self, forest=None):
+        """
+        Salinan pipeline dengan forest sklearn diganti FlatForest
+
+        Args:
+            forest: Forest hasil konversi (misalnya CompactForest dari
+                ModelTrainer.export_compact); default FlatForest dari model
+
+        Returns:
+            InferencePipeline: Pipeline dengan model berbasis array datar
+        """
+        flat = copy.copy(self)
+        flat.model = forest if forest is not None else FlatForest.from_estimator(self.model)
+        flat._prepare()
+        return flat
+
+    def save(self, filepath):
+        """
+        Menyimpan pipeline sebagai satu artefak
+
+        Args:
+            filepath (str): Path penyimpanan
+        """
+        with atomic_write(filepath) as tmp_path:
+            joblib.dump(self, tmp_path)
+        print(f"Pipeline versi {self.version} disimpan di {filepath}")
+
+    @staticmethod
+    def load(filepath, mmap_mode=None):
+        """
+        Memuat pipeline yang tersimpan
+
+        Args:
+            filepath (str): Path artefak
+            mmap_mode (str): 'r' untuk memetakan array NumPy langsung dari file
+                (artefak harus disimpan tanpa kompresi)
+
+        Returns:
+            InferencePipeline: Pipeline yang dimuat
+        """
+        return joblib.load(filepath, mmap_mode=mmap_mode)
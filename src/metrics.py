@@ -0,0 +1,280 @@
+"""
+Modul Metrik Jalur Prediksi
+
+Antarmuka metrik yang dapat diganti untuk mengukur waktu setiap tahap
+prediksi (muat model, preprocessing, prediksi), jumlah baris, hit/miss
+cache, dan versi model.
+
+Implementasi:
+- NullMetrics: Default; semua operasi kosong sehingga overhead nyaris nol
+- MetricsRegistry: Agregasi di memori dengan ekspor format teks Prometheus
+- StructuredLogSink: Setiap kejadian ditulis sebagai log JSON
+- FanoutMetrics: Meneruskan kejadian ke beberapa backend sekaligus
+
+Fungsi:
+- get_metrics() / set_metrics(): Backend metrik aktif untuk proses ini
+"""
+
+import bisect
+import json
+import logging
+import threading
+import time
+
+# Batas bucket histogram latensi (detik)
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class NullMetrics:
+    """
+    Backend metrik nonaktif
+    """
+    enabled = False
+
+    def increment(self, name, value=1, **labels):
+        pass
+
+    def observe(self, name, value, **labels):
+        pass
+
+    def set_gauge(self, name, value, **labels):
+        pass
+
+    def remove_gauge(self, name, **labels):
+        pass
+
+    def timer(self, name, **labels):
+        return _NULL_TIMER
+
+
+class _EnabledMetrics(NullMetrics):
+    enabled = True
+
+    def timer(self, name, **labels):
+        """
+        Context manager yang mencatat durasi blok sebagai observasi histogram
+
+        Args:
+            name (str): Nama metrik
+            **labels: Label metrik
+
+        Returns:
+            Context manager pengukur waktu
+        """
+        return _Timer(self, name, labels)
+
+
+class MetricsRegistry(_EnabledMetrics):
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Inisialisasi registry metrik di memori
+
+        Args:
+            buckets (tuple): Batas bucket histogram
+        """
+        self.buckets = tuple(buckets)
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def increment(self, name, value=1, **labels):
+        """
+        Menambah nilai counter
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """
+        Mencatat satu observasi histogram
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {
+                    'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0
+                }
+            histogram['counts'][bisect.bisect_left(self.buckets, value)] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def set_gauge(self, name, value, **labels):
+        """
+        Menetapkan nilai gauge
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            self.gauges[key] = value
+
+    def remove_gauge(self, name, **labels):
+        """
+        Menghapus semua seri gauge bernama `name` yang memuat label tersebut
+
+        Args:
+            name (str): Nama metrik
+            **labels: Label yang harus cocok; kosong berarti semua seri
+        """
+        wanted = set(labels.items())
+        with self._lock:
+            for key in [key for key in self.gauges
+                        if key[0] == name and wanted <= set(key[1])]:
+                del self.gauges[key]
+
+    @staticmethod
+    def _format_labels(labels, extra=()):
+        items = list(labels) + list(extra)
+        if not items:
+            return ''
+        return '{' + ','.join(f'{k}="{v}"' for k, v in items) + '}'
+
+    def render_prometheus(self):
+        """
+        Mengekspor semua metrik dalam format teks Prometheus
+
+        Returns:
+            str: Teks eksposisi Prometheus
+        """
+        lines = []
+        with self._lock:
+            for kind, values in (('counter', self.counters), ('gauge', self.gauges)):
+                seen = set()
+                for (name, labels), value in sorted(values.items()):
+                    if name not in seen:
+                        lines.append(f'# TYPE {name} {kind}')
+                        seen.add(name)
+                    lines.append(f'{name}{self._format_labels(labels)} {value}')
+
+            seen = set()
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                if name not in seen:
+                    lines.append(f'# TYPE {name} histogram')
+                    seen.add(name)
+                cumulative = 0
+                bounds = [str(b) for b in self.buckets] + ['+Inf']
+                for bound, count in zip(bounds, histogram['counts']):
+                    cumulative += count
+                    label_text = self._format_labels(labels, [('le', bound)])
+                    lines.append(f'{name}_bucket{label_text} {cumulative}')
+                label_text = self._format_labels(labels)
+                lines.append(f'{name}_sum{label_text} {histogram["sum"]}')
+                lines.append(f'{name}_count{label_text} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+class StructuredLogSink(_EnabledMetrics):
+    def __init__(self, logger_name='house_price.metrics', level=logging.INFO):
+        """
+        Inisialisasi sink log terstruktur
+
+        Args:
+            logger_name (str): Nama logger
+            level (int): Level log
+        """
+        self.logger = logging.getLogger(logger_name)
+        self.level = level
+
+    def _emit(self, kind, name, value, labels):
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, json.dumps(
+                {'type': kind, 'metric': name, 'value': value, 'labels': labels}
+            ))
+
+    def increment(self, name, value=1, **labels):
+        self._emit('counter', name, value, labels)
+
+    def observe(self, name, value, **labels):
+        self._emit('observation', name, value, labels)
+
+    def set_gauge(self, name, value, **labels):
+        self._emit('gauge', name, value, labels)
+
+    def remove_gauge(self, name, **labels):
+        self._emit('gauge_removed', name, None, labels)
+
+
+class FanoutMetrics(_EnabledMetrics):
+    def __init__(self, *backends):
+        """
+        Meneruskan setiap kejadian ke beberapa backend
+
+        Args:
+            *backends: Backend metrik
+        """
+        self.backends = backends
+
+    def increment(self, name, value=1, **labels):
+        for backend in self.backends:
+            backend.increment(name, value, **labels)
+
+    def observe(self, name, value, **labels):
+        for backend in self.backends:
+            backend.observe(name, value, **labels)
+
+    def set_gauge(self, name, value, **labels):
+        for backend in self.backends:
+            backend.set_gauge(name, value, **labels)
+
+    def remove_gauge(self, name, **labels):
+        for backend in self.backends:
+            backend.remove_gauge(name, **labels)
+
+
+_metrics = NullMetrics()
+
+
+def get_metrics():
+    """
+    Backend metrik aktif
+
+    Returns:
+        Backend metrik (default NullMetrics)
+    """
+    return _metrics
+
+
+def set_metrics(metrics):
+    """
+    Mengganti backend metrik aktif
+
+    Args:
+        metrics: Backend metrik; None untuk menonaktifkan
+    """
+    global _metrics
+    _metrics = metrics if metrics is not None else NullMetrics()
@@ -0,0 +1,196 @@
+"""
+Modul Registry Model Harga Rumah
+
+Menyimpan artefak model yang sudah dimuat di memori proses sehingga
+prediksi tidak perlu membaca ulang file pickle dari disk.
+
+Fitur:
+- Artefak dimuat sekali per proses dan dipakai ulang
+- Invalidasi otomatis berdasarkan mtime/ukuran (opsional hash) file,
+  sehingga artefak baru dari train_model.py langsung terpakai
+- Beberapa versi model dapat disimpan sekaligus dengan eviksi LRU
+- atomic_write() untuk menulis artefak tanpa merusak pembaca yang sedang
+  berjalan (termasuk proses yang memetakan artefak lewat mmap)
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from src.metrics import get_metrics
+
+
+@contextmanager
+def atomic_write(filepath):
+    """
+    Menulis artefak ke file sementara lalu menggantinya secara atomik
+
+    File lama tidak pernah dipotong: proses yang masih memetakan file lama
+    (mmap) tetap memegang inode lama, dan registry tidak pernah membaca
+    artefak yang baru setengah ditulis.
+
+    Args:
+        filepath (str): Path tujuan
+
+    Yields:
+        str: Path file sementara di direktori yang sama untuk ditulis
+    """
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(filepath),
+                                    suffix='.tmp')
+    os.close(fd)
+    # mkstemp membuat file 0600; artefak model biasa dapat dibaca semua proses
+    os.chmod(tmp_path, 0o644)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ModelRegistry:
+    def __init__(self, max_versions=3, use_hash=False):
+        """
+        Inisialisasi registry model
+
+        Args:
+            max_versions (int): Jumlah maksimum versi model yang disimpan di memori
+            use_hash (bool): Gunakan hash isi file (bukan hanya mtime/ukuran)
+                untuk mendeteksi perubahan artefak
+        """
+        self.max_versions = max_versions
+        self.use_hash = use_hash
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def _file_hash(self, path):
+        """
+        Menghitung hash SHA-256 isi file
+
+        Args:
+            path (str): Path file
+
+        Returns:
+            str: Hash heksadesimal
+        """
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def file_signature(self, paths):
+        """
+        Membuat tanda tangan artefak dari metadata file
+
+        Args:
+            paths (list): Daftar path file artefak
+
+        Returns:
+            tuple: Tanda tangan (path, mtime, ukuran[, hash]) tiap file
+        """
+        signature = []
+        for path in paths:
+            stat = os.stat(path)
+            item = (path, stat.st_mtime_ns, stat.st_size)
+            if self.use_hash:
+                item += (self._file_hash(path),)
+            signature.append(item)
+        return tuple(signature)
+
+    def get(self, key, paths, loader):
+        """
+        Mengambil artefak dari cache, memuat ulang bila file berubah
+
+        Args:
+            key (str): Kunci versi model (misalnya direktori model)
+            paths (list): File artefak yang menentukan validitas cache
+            loader (callable): Fungsi tanpa argumen untuk memuat artefak
+
+        Returns:
+            Artefak yang dimuat oleh loader
+        """
+        metrics = get_metrics()
+        signature = self.file_signature(paths)
+        with self._lock:
+            bundle = self._lookup(key, signature)
+            if bundle is not None:
+                return bundle
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Artefak dimuat di luar lock global: pemuatan satu kunci tidak
+        # menahan hit untuk kunci lain, dan thread yang menunggu kunci yang
+        # sama memakai hasil pemuatan pertama (double-checked locking)
+        with key_lock:
+            signature = self.file_signature(paths)
+            with self._lock:
+                bundle = self._lookup(key, signature)
+                if bundle is not None:
+                    return bundle
+                self.misses += 1
+            metrics.increment('model_cache_misses_total')
+
+            with metrics.timer('model_load_seconds'):
+                bundle = loader()
+
+            with self._lock:
+                self._entries[key] = (signature, bundle)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_versions:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._key_locks.pop(evicted, None)
+            return bundle
+
+    def _lookup(self, key, signature):
+        """
+        Mengambil artefak yang masih valid (dipanggil dengan lock global)
+
+        Args:
+            key (str): Kunci versi model
+            signature (tuple): Tanda tangan file saat ini
+
+        Returns:
+            Artefak dari cache, atau None bila belum dimuat atau sudah usang
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != signature:
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        get_metrics().increment('model_cache_hits_total')
+        return entry[1]
+
+    def invalidate(self, key=None):
+        """
+        Menghapus artefak dari cache
+
+        Args:
+            key (str): Kunci yang dihapus; None untuk menghapus semua
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        """
+        Statistik penggunaan cache
+
+        Returns:
+            dict: Jumlah hit, miss, dan versi yang sedang dimuat
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'loaded': list(self._entries.keys())
+            }
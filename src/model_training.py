@@ -4,21 +4,138 @@ Modul Pelatihan Model Prediksi Harga Rumah
 Kelas dan fungsi untuk melatih model machine learning
 """
 
+from concurrent.futures import ProcessPoolExecutor
+
 import joblib
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.linear_model import LinearRegression
+import numpy as np
+from sklearn.base import BaseEstimator, RegressorMixin
+from sklearn.ensemble import (
+    GradientBoostingRegressor, HistGradientBoostingRegressor, RandomForestRegressor
+)
+from sklearn.linear_model import LinearRegression, SGDRegressor
 from sklearn.svm import SVR
 
+from src.flat_forest import CompactForest, FlatForest, verify_forest
+from src.model_registry import atomic_write
+
+class LogTargetSGDRegressor(BaseEstimator, RegressorMixin):
+    def __init__(self, alpha=0.0001, eta0=0.01, random_state=42, feature_clip=None):
+        """
+        Regresi SGD pada log harga yang mendukung partial_fit
+
+        Args:
+            alpha (float): Kekuatan regularisasi
+            eta0 (float): Learning rate awal
+            random_state (int): Seed untuk reproduksibilitas
+            feature_clip (float): Batas absolut fitur terstandardisasi (opsional);
+                mencegah outlier ekstrem meledakkan prediksi expm1
+        """
+        self.alpha = alpha
+        self.eta0 = eta0
+        self.random_state = random_state
+        self.feature_clip = feature_clip
+
+    def _new_estimator(self):
+        return SGDRegressor(alpha=self.alpha, eta0=self.eta0, random_state=self.random_state)
+
+    def clip_bounds(self):
+        """
+        Batas bawah dan atas fitur terstandardisasi
+
+        Returns:
+            tuple: (bawah, atas) berupa skalar atau array per fitur; None bila
+                fitur tidak dipotong
+        """
+        # clip_bounds_ diisi InferencePipeline.update_statistics setelah skala
+        # fitur berubah; model lama (sebelum feature_clip) tidak memiliki keduanya
+        bounds = getattr(self, 'clip_bounds_', None)
+        if bounds is not None:
+            return bounds
+        clip = getattr(self, 'feature_clip', None)
+        return None if clip is None else (-clip, clip)
+
+    def _clip(self, X):
+        bounds = self.clip_bounds()
+        return X if bounds is None else np.clip(X, *bounds)
+
+    def fit(self, X, y):
+        """
+        Melatih model dari awal
+        """
+        self.estimator_ = self._new_estimator().fit(self._clip(X), np.log1p(y))
+        return self
+
+    def partial_fit(self, X, y):
+        """
+        Melanjutkan pelatihan dengan batch data baru
+        """
+        if not hasattr(self, 'estimator_'):
+            self.estimator_ = self._new_estimator()
+        self.estimator_.partial_fit(self._clip(X), np.log1p(y))
+        return self
+
+    def predict(self, X):
+        """
+        Memprediksi harga (kembali ke skala rupiah)
+        """
+        return np.expm1(self.estimator_.predict(self._clip(X)))
+
+    @property
+    def coef_(self):
+        return self.estimator_.coef_
+
+    @coef_.setter
+    def coef_(self, value):
+        self.estimator_.coef_ = value
+
+    @property
+    def intercept_(self):
+        return self.estimator_.intercept_
+
+    @intercept_.setter
+    def intercept_(self, value):
+        self.estimator_.intercept_ = value
+
+def _fit_shard(model_type, model_params, X_train, y_train):
+    """
+    Melatih satu model shard di proses worker
+    """
+    trainer = ModelTrainer(model_type, model_params)
+    trainer.train_model(X_train, y_train)
+    return trainer.model
+
 class ModelTrainer:
-    def __init__(self, model_type='random_forest'):
+    def __init__(self, model_type='random_forest', model_params=None):
         """
         Inisialisasi trainer model
         
         Args:
             model_type (str): Jenis model yang akan dilatih
+            model_params (dict): Hyperparameter tambahan, misalnya batas ukuran
+                pohon (max_depth, max_leaf_nodes)
         """
         self.model_type = model_type
+        self.model_params = model_params or {}
         self.model = self._select_model()
+        if self.model_params:
+            self.model.set_params(**self.model_params)
+
+    @classmethod
+    def from_model(cls, model):
+        """
+        Membuat trainer di sekitar model yang sudah dilatih
+
+        Args:
+            model: Model machine learning terlatih
+
+        Returns:
+            ModelTrainer: Trainer dengan model_type berupa nama kelas model
+        """
+        trainer = cls.__new__(cls)
+        trainer.model_type = type(model).__name__
+        trainer.model_params = {}
+        trainer.model = model
+        return trainer
 
     def _select_model(self):
         """
@@ -30,7 +147,10 @@ class ModelTrainer:
         models = {
             'random_forest': RandomForestRegressor(n_estimators=100, random_state=42),
             'linear_regression': LinearRegression(),
-            'svr': SVR(kernel='rbf')
+            'svr': SVR(kernel='rbf'),
+            'sgd': LogTargetSGDRegressor(random_state=42),
+            'gradient_boosting': GradientBoostingRegressor(random_state=42),
+            'hist_gradient_boosting': HistGradientBoostingRegressor(random_state=42)
         }
         return models.get(self.model_type, RandomForestRegressor())
 
@@ -44,6 +164,77 @@ class ModelTrainer:
         """
         self.model.fit(X_train, y_train)
 
+    def train_sharded(self, shards, n_jobs=None):
+        """
+        Melatih satu model terpisah per shard (misalnya per kota) secara paralel
+
+        Setiap shard dilatih di proses tersendiri dengan jenis model dan
+        hyperparameter trainer ini; shard terbesar dijadwalkan lebih dulu
+        agar beban antar proses seimbang.
+
+        Args:
+            shards (dict): Kunci shard -> (X_train, y_train)
+            n_jobs (int): Jumlah proses; default jumlah CPU
+
+        Returns:
+            dict: Kunci shard -> model terlatih
+        """
+        order = sorted(shards, key=lambda key: len(shards[key][1]), reverse=True)
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            futures = {
+                key: pool.submit(_fit_shard, self.model_type, self.model_params, *shards[key])
+                for key in order
+            }
+            return {key: futures[key].result() for key in shards}
+
+    def update_model(self, X_new, y_new, n_new_estimators=10):
+        """
+        Pelatihan inkremental dengan batch data baru
+        
+        Model ensemble menambah pohon/iterasi boosting baru (warm_start) yang
+        dilatih pada data baru; model dengan partial_fit melanjutkan pembelajaran.
+        
+        Args:
+            X_new (array): Data fitur baru
+            y_new (array): Target baru
+            n_new_estimators (int): Jumlah pohon yang ditambahkan (model ensemble)
+        """
+        if hasattr(self.model, 'warm_start') and hasattr(self.model, 'n_estimators'):
+            self.model.set_params(
+                warm_start=True, n_estimators=self.model.n_estimators + n_new_estimators
+            )
+            self.model.fit(X_new, y_new)
+        elif hasattr(self.model, 'warm_start') and hasattr(self.model, 'max_iter'):
+            self.model.set_params(
+                warm_start=True, max_iter=self.model.max_iter + n_new_estimators
+            )
+            self.model.fit(X_new, y_new)
+        elif hasattr(self.model, 'partial_fit'):
+            self.model.partial_fit(X_new, y_new)
+        else:
+            raise ValueError(f"Model {self.model_type} tidak mendukung pelatihan inkremental")
+
+    def export_compact(self, X_verify=None, rtol=1e-6, value_dtype=np.float64):
+        """
+        Mengekspor forest terlatih ke format ringkas CompactForest
+
+        Args:
+            X_verify (array): Data fitur untuk memverifikasi prediksi terhadap
+                model sklearn (opsional)
+            rtol (float): Galat relatif maksimum saat verifikasi
+            value_dtype: Tipe nilai daun (float32 untuk artefak lebih kecil)
+
+        Returns:
+            CompactForest: Forest ringkas
+        """
+        if not FlatForest.supports(self.model):
+            raise ValueError(f"Model {self.model_type} tidak dapat diekspor ke format ringkas")
+
+        compact = CompactForest.from_estimator(self.model, value_dtype)
+        if X_verify is not None:
+            verify_forest(self.model, compact, X_verify, rtol)
+        return compact
+
     def save_model(self, filepath):
         """
         Menyimpan model yang telah dilatih
@@ -51,17 +242,20 @@ class ModelTrainer:
         Args:
             filepath (str): Path penyimpanan model
         """
-        joblib.dump(self.model, filepath)
+        with atomic_write(filepath) as tmp_path:
+            joblib.dump(self.model, tmp_path)
         print(f"Model disimpan di {filepath}")
 
-    def load_model(self, filepath):
+    def load_model(self, filepath, mmap_mode=None):
         """
         Memuat model yang tersimpan
         
         Args:
             filepath (str): Path model
+            mmap_mode (str): 'r' untuk memetakan array NumPy langsung dari file
+                (berguna untuk FlatForest; node Tree sklearn tetap disalin)
         
         Returns:
             Model yang dimuat
         """
-        return joblib.load(filepath)
\ No newline at end of file
+        return joblib.load(filepath, mmap_mode=mmap_mode)
\ No newline at end of file
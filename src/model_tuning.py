@@ -0,0 +1,292 @@
+"""
+Modul Tuning dan Perbandingan Model Harga Rumah
+
+Menjalankan pencarian hyperparameter dengan cross-validation untuk
+setiap jenis model ModelTrainer secara paralel di semua core, dengan
+pemangkasan konfigurasi buruk lewat successive halving.
+
+Fungsi dan kelas:
+- serving_pipeline(): Model dibungkus seperti saat dilayani (InferencePipeline)
+- measure_latency(): Latensi prediksi satu baris (p50/p95) lewat jalur serving
+- artifact_size(): Ukuran artefak pipeline yang ditulis train_model.py
+- select_fastest_model(): Model tercepat yang memenuhi target akurasi
+- ModelTuner: Pencarian hyperparameter dan leaderboard model
+"""
+
+import io
+import time
+
+import joblib
+
+import numpy as np
+import pandas as pd
+from scipy.stats import loguniform, randint
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.metrics import r2_score
+from sklearn.model_selection import HalvingRandomSearchCV, KFold
+
+from src.flat_forest import CompactForest, FlatForest
+from src.inference import InferencePipeline
+from src.model_training import ModelTrainer
+
+# Ruang pencarian per jenis model ModelTrainer
+PARAM_DISTRIBUTIONS = {
+    'random_forest': {
+        'n_estimators': randint(50, 300),
+        'max_depth': [None, 10, 20, 30],
+        'min_samples_leaf': randint(1, 10),
+        'max_features': [1.0, 'sqrt', 0.5]
+    },
+    'gradient_boosting': {
+        'n_estimators': randint(50, 300),
+        'learning_rate': loguniform(0.01, 0.3),
+        'max_depth': randint(2, 6),
+        'subsample': [0.7, 0.85, 1.0]
+    },
+    'hist_gradient_boosting': {
+        'max_iter': randint(50, 300),
+        'learning_rate': loguniform(0.01, 0.3),
+        'max_leaf_nodes': [7, 15, 31, 63],
+        'min_samples_leaf': randint(5, 50)
+    },
+    'linear_regression': {
+        'fit_intercept': [True, False]
+    },
+    'svr': {
+        'C': loguniform(1e6, 1e11),
+        'epsilon': loguniform(1e6, 1e9),
+        'gamma': ['scale', 'auto']
+    }
+}
+
+# Kandidat untuk seleksi berbasis latensi: (jenis model, hyperparameter)
+LATENCY_CANDIDATES = {
+    'random_forest': ('random_forest', {}),
+    'random_forest_depth12': ('random_forest', {'max_depth': 12}),
+    'random_forest_leaf256': ('random_forest', {'n_estimators': 50, 'max_leaf_nodes': 256}),
+    'hist_gradient_boosting': ('hist_gradient_boosting', {}),
+    'hist_gradient_boosting_small': (
+        'hist_gradient_boosting', {'max_iter': 50, 'max_leaf_nodes': 15}
+    ),
+    'linear_regression': ('linear_regression', {})
+}
+
+
+def serving_pipeline(model, n_features):
+    """
+    Membungkus model seperti saat dilayani prediction.load_pipeline()
+
+    Fitur kandidat sudah terstandardisasi, sehingga imputer/scaler identitas
+    cukup; yang diukur adalah predict_transformed (termasuk jalur cepat
+    Tree.predict untuk forest), bukan model.predict sklearn.
+
+    Args:
+        model: Model terlatih
+        n_features (int): Jumlah fitur
+
+    Returns:
+        InferencePipeline: Pipeline serving
+    """
+    return InferencePipeline([f'x{i}' for i in range(n_features)], np.zeros(n_features),
+                             np.zeros(n_features), np.ones(n_features), model, version='candidate')
+
+
+def measure_latency(pipeline, X, n_repeats=200):
+    """
+    Mengukur latensi prediksi satu baris lewat jalur serving
+
+    Args:
+        pipeline (InferencePipeline): Pipeline serving (lihat serving_pipeline)
+        X (array): Data fitur terstandardisasi; baris diambil bergiliran
+        n_repeats (int): Jumlah pengukuran
+
+    Returns:
+        dict: Latensi p50 dan p95 dalam milidetik
+    """
+    X = np.asarray(X, dtype=np.float64)
+    timings = np.empty(n_repeats)
+    for i in range(n_repeats):
+        row = X[i % len(X)].reshape(1, -1)
+        start = time.perf_counter()
+        pipeline.predict_transformed(row)
+        timings[i] = time.perf_counter() - start
+
+    return {
+        'latency_p50_ms': float(np.percentile(timings, 50) * 1000),
+        'latency_p95_ms': float(np.percentile(timings, 95) * 1000)
+    }
+
+
+def artifact_size(pipeline):
+    """
+    Mengukur ukuran artefak yang ditulis train_model.py (joblib tanpa kompresi)
+
+    Args:
+        pipeline (InferencePipeline): Pipeline serving
+
+    Returns:
+        dict: Ukuran pipeline utama dan, untuk forest, pipeline CompactForest
+            (memory-map) dalam byte
+    """
+    def dumped_size(obj):
+        buffer = io.BytesIO()
+        joblib.dump(obj, buffer)
+        return buffer.tell()
+
+    sizes = {'artifact_bytes': dumped_size(pipeline), 'compact_artifact_bytes': np.nan}
+    if FlatForest.supports(pipeline.model):
+        compact = pipeline.to_flat(CompactForest.from_estimator(pipeline.model))
+        sizes['compact_artifact_bytes'] = dumped_size(compact)
+    return sizes
+
+
+def select_fastest_model(X_train, y_train, X_val, y_val, candidates=None, target_r2=None,
+                         tolerance=0.02):
+    """
+    Memilih model dengan latensi p95 terendah yang memenuhi target akurasi
+
+    Args:
+        X_train (array): Data fitur training
+        y_train (array): Target training
+        X_val (array): Data fitur validasi
+        y_val (array): Target validasi
+        candidates (dict): Nama -> (jenis model, hyperparameter); default LATENCY_CANDIDATES
+        target_r2 (float): Target R² validasi; default R² terbaik dikurangi tolerance
+        tolerance (float): Penurunan R² yang masih diterima bila target_r2 tidak diberikan
+
+    Returns:
+        tuple: (nama kandidat terpilih, pandas.DataFrame laporan semua kandidat)
+    """
+    candidates = candidates or LATENCY_CANDIDATES
+
+    rows = []
+    for name, (model_type, params) in candidates.items():
+        trainer = ModelTrainer(model_type, params)
+        start = time.perf_counter()
+        trainer.train_model(X_train, y_train)
+        fit_time = time.perf_counter() - start
+
+        pipeline = serving_pipeline(trainer.model, np.shape(X_train)[1])
+        rows.append({
+            'candidate': name,
+            'model_type': model_type,
+            'val_r2': r2_score(y_val, pipeline.predict_transformed(X_val)),
+            'fit_time_s': fit_time,
+            **measure_latency(pipeline, X_val),
+            **artifact_size(pipeline)
+        })
+
+    report = pd.DataFrame(rows)
+    if target_r2 is None:
+        target_r2 = report['val_r2'].max() - tolerance
+    report['meets_target'] = report['val_r2'] >= target_r2
+
+    eligible = report[report['meets_target']]
+    if eligible.empty:
+        eligible = report[report['val_r2'] == report['val_r2'].max()]
+    best = eligible.sort_values(['latency_p95_ms', 'artifact_bytes']).iloc[0]['candidate']
+
+    report = report.sort_values(['meets_target', 'latency_p95_ms'], ascending=[False, True])
+    return best, report.reset_index(drop=True)
+
+
+class ModelTuner:
+    def __init__(self, model_types=None, n_splits=5, n_candidates=27, factor=3,
+                 n_jobs=-1, random_state=42):
+        """
+        Inisialisasi tuner model
+
+        Args:
+            model_types (list): Jenis model yang dibandingkan; default semua
+            n_splits (int): Jumlah fold cross-validation
+            n_candidates: Jumlah konfigurasi awal per model (successive halving)
+            factor (int): Faktor pemangkasan kandidat per iterasi halving
+            n_jobs (int): Jumlah proses paralel (-1 untuk semua core)
+            random_state (int): Seed untuk reproduksibilitas
+        """
+        self.model_types = model_types or list(PARAM_DISTRIBUTIONS)
+        self.n_splits = n_splits
+        self.n_candidates = n_candidates
+        self.factor = factor
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.searches = {}
+        self.leaderboard = None
+        self._splits = {}
+
+    def fold_splits(self, X):
+        """
+        Pembagian fold yang di-cache sehingga semua model memakai fold yang sama
+
+        Args:
+            X (array): Data fitur
+
+        Returns:
+            list: Pasangan indeks (train, validasi) per fold
+        """
+        n_samples = len(X)
+        if n_samples not in self._splits:
+            kfold = KFold(n_splits=self.n_splits, shuffle=True, random_state=self.random_state)
+            self._splits[n_samples] = list(kfold.split(np.arange(n_samples)))
+        return self._splits[n_samples]
+
+    def search(self, model_type, X, y):
+        """
+        Pencarian hyperparameter untuk satu jenis model
+
+        Args:
+            model_type (str): Jenis model ModelTrainer
+            X (array): Data fitur training
+            y (array): Target training
+
+        Returns:
+            HalvingRandomSearchCV: Hasil pencarian
+        """
+        search = HalvingRandomSearchCV(
+            ModelTrainer(model_type).model,
+            PARAM_DISTRIBUTIONS[model_type],
+            n_candidates=self.n_candidates,
+            factor=self.factor,
+            min_resources='exhaust',
+            cv=self.fold_splits(X),
+            scoring='r2',
+            n_jobs=self.n_jobs,
+            random_state=self.random_state
+        )
+        search.fit(X, y)
+        self.searches[model_type] = search
+        return search
+
+    def run(self, X, y):
+        """
+        Menjalankan pencarian untuk semua model dan menyusun leaderboard
+
+        Args:
+            X (array): Data fitur training
+            y (array): Target training
+
+        Returns:
+            pandas.DataFrame: Leaderboard akurasi, waktu fit, dan latensi prediksi
+        """
+        rows = []
+        for model_type in self.model_types:
+            print(f"Tuning {model_type}...")
+            search = self.search(model_type, X, y)
+            results = search.cv_results_
+            best = search.best_index_
+
+            rows.append({
+                'model_type': model_type,
+                'cv_r2': search.best_score_,
+                'cv_r2_std': results['std_test_score'][best],
+                'fit_time_s': results['mean_fit_time'][best],
+                'refit_time_s': search.refit_time_,
+                'n_candidates': len(results['params']),
+                **measure_latency(serving_pipeline(search.best_estimator_, np.shape(X)[1]), X),
+                'best_params': search.best_params_
+            })
+
+        self.leaderboard = (
+            pd.DataFrame(rows).sort_values('cv_r2', ascending=False).reset_index(drop=True)
+        )
+        return self.leaderboard
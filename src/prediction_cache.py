@@ -0,0 +1,168 @@
+"""
+Modul Cache Hasil Prediksi Harga Rumah
+
+Menyimpan hasil prediksi per baris input sehingga kombinasi fitur yang
+sering berulang (luas tanah, luas bangunan, jumlah kamar) tidak melewati
+imputasi, standardisasi, dan forest lagi.
+
+Fitur:
+- Kunci berupa versi model dan tuple fitur yang dinormalisasi (float64,
+  dibulatkan, NaN diseragamkan)
+- Batas jumlah entri dengan eviksi LRU, serta TTL opsional
+- Invalidasi otomatis ketika pipeline dimuat ulang (objek atau versi baru)
+- Baris identik dalam satu batch hanya diprediksi sekali; batch besar
+  (file scoring) melewati cache
+- Statistik hit rate, juga dikirim ke metrics aktif
+"""
+
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+from src.metrics import get_metrics
+
+
+class PredictionCache:
+    def __init__(self, max_entries=10_000, ttl=None, decimals=6, max_batch_rows=1024):
+        """
+        Inisialisasi cache prediksi
+
+        Args:
+            max_entries (int): Jumlah maksimum baris yang disimpan
+            ttl (float): Umur maksimum entri dalam detik; None tanpa batas
+            decimals (int): Pembulatan fitur sebelum menjadi kunci
+            max_batch_rows (int): Batch yang lebih besar langsung ke model; kunci
+                per baris hanya menambah waktu dan akan menggusur seluruh LRU
+        """
+        self.max_entries = max_entries
+        self.max_batch_rows = max_batch_rows
+        self.ttl = ttl
+        self.decimals = decimals
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.bypassed = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._pipeline = None
+
+    def _keys(self, version, X):
+        """
+        Kunci cache untuk setiap baris matriks fitur
+        """
+        rows = np.round(X, self.decimals).tolist()
+        # NaN tidak sama dengan dirinya sendiri; diganti None agar kunci cocok
+        return [(version, tuple(None if value != value else value for value in row))
+                for row in rows]
+
+    def _bind(self, pipeline):
+        """
+        Mengosongkan cache bila pipeline berganti (dimuat ulang)
+        """
+        current = self._pipeline() if self._pipeline is not None else None
+        if current is pipeline:
+            return
+        if self._entries:
+            self.invalidations += 1
+            self._entries.clear()
+        self._pipeline = weakref.ref(pipeline)
+
+    def predict(self, pipeline, X, predict=None):
+        """
+        Prediksi dengan cache; hanya baris yang belum ada yang dihitung
+
+        Args:
+            pipeline: InferencePipeline atau SlimPipeline
+            X: Data fitur (DataFrame, dict, atau array)
+            predict (callable): Fungsi prediksi untuk baris yang tidak ada di
+                cache; default pipeline.predict
+
+        Returns:
+            numpy.ndarray: Prediksi harga
+        """
+        X = pipeline.to_array(X)
+        if len(X) > self.max_batch_rows:
+            with self._lock:
+                self.bypassed += len(X)
+            return (predict or pipeline.predict)(X)
+
+        keys = self._keys(pipeline.version, X)
+        prediction = np.empty(len(keys))
+        # Baris yang tidak ada di cache, dikelompokkan per kunci: baris identik
+        # dalam satu panggilan hanya dihitung sekali
+        pending = {}
+        now = time.monotonic()
+
+        with self._lock:
+            self._bind(pipeline)
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and self.ttl is not None and now - entry[1] > self.ttl:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    pending.setdefault(key, []).append(i)
+                    continue
+                self._entries.move_to_end(key)
+                prediction[i] = entry[0]
+            n_hits = len(keys) - len(pending)
+            self.hits += n_hits
+            self.misses += len(pending)
+
+        if pending:
+            values = (predict or pipeline.predict)(X[[rows[0] for rows in pending.values()]])
+            with self._lock:
+                for (key, rows), value in zip(pending.items(), values):
+                    prediction[rows] = value
+                    self._entries[key] = (float(value), now)
+                    self._entries.move_to_end(key)
+                n_evicted = max(len(self._entries) - self.max_entries, 0)
+                for _ in range(n_evicted):
+                    self._entries.popitem(last=False)
+                self.evictions += n_evicted
+
+        metrics = get_metrics()
+        if metrics.enabled:
+            metrics.increment('prediction_cache_hits_total', n_hits)
+            metrics.increment('prediction_cache_misses_total', len(pending))
+            metrics.set_gauge('prediction_cache_entries', len(self._entries))
+            metrics.set_gauge('prediction_cache_hit_rate', self.hit_rate)
+        return prediction
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        """
+        Mengosongkan semua entri
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Statistik cache
+
+        Returns:
+            dict: Jumlah hit, miss, hit rate, entri, eviksi, kedaluwarsa, invalidasi,
+                dan baris batch besar yang melewati cache
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+            'bypassed_rows': self.bypassed
+        }
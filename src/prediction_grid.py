@@ -0,0 +1,251 @@
+"""
+Modul Tabel Prediksi Harga Rumah
+
+Menghitung prediksi model sekali untuk setiap titik lattice input (luas
+tanah, luas bangunan, jumlah kamar) lalu melayani prediksi berikutnya dari
+tabel di memori. Setiap pencarian membutuhkan waktu konstan, tidak
+bergantung pada ukuran model.
+
+Lattice mengikuti langkah input form (bilangan bulat) dan pencarian hanya
+mengambil titik yang sama persis, tanpa interpolasi: forest bersifat
+konstan per potongan, sehingga interpolasi multilinear antar titik grid
+berjarak 10 m² meleset 10% pada persentil 90 dan hingga 5,8x pada input
+bulat acak. Input yang tidak tepat berada di lattice (nilai pecahan atau di
+luar rentang) tetap diprediksi dengan model, sehingga hasil tabel identik
+dengan model.
+
+Untuk forest, tabel diisi langsung dari struktur pohon: setiap daun
+menempati kotak indeks lattice, sehingga jutaan titik tidak perlu
+ditelusuri satu per satu. Model lain diprediksi per titik.
+"""
+
+import numpy as np
+
+from src.flat_forest import TREE_LEAF, CompactForest, FlatForest
+
+# Rentang input form aplikasi Streamlit dengan langkah 1 (input bulat);
+# mencakup sekitar 93% listing. 2,76 juta titik (22 MB), dibangun sekali
+# per versi model (kurang dari 1 detik untuk forest 100 pohon)
+DEFAULT_AXES = {
+    'land_size_m2': np.arange(0, 501),
+    'building_size_m2': np.arange(0, 501),
+    'bedrooms': np.arange(0, 11)
+}
+
+
+class PredictionGrid:
+    def __init__(self, feature_names, base_values, axes, values, version=None):
+        """
+        Inisialisasi tabel prediksi
+
+        Args:
+            feature_names (list): Urutan semua fitur pipeline
+            base_values (array): Nilai fitur di luar grid (median data latih)
+            axes (dict): Nama fitur -> titik grid yang terurut naik
+            values (numpy.ndarray): Prediksi di setiap titik grid
+            version (str): Versi pipeline yang menghasilkan tabel
+        """
+        self.feature_names = list(feature_names)
+        self.base_values = np.asarray(base_values, dtype=np.float64)
+        self.axes = {name: np.asarray(points, dtype=np.float64) for name, points in axes.items()}
+        self.values = values
+        self.version = version
+        self._indices = [self.feature_names.index(name) for name in self.axes]
+        self._others = np.setdiff1d(np.arange(len(self.feature_names)), self._indices)
+
+    @classmethod
+    def build(cls, pipeline, axes=None, batch_size=100_000):
+        """
+        Memprediksi semua titik grid dengan pipeline
+
+        Args:
+            pipeline (InferencePipeline): Pipeline terlatih
+            axes (dict): Nama fitur -> titik grid; default DEFAULT_AXES. Nilai
+                median (fill_values) ditambahkan ke setiap sumbu sehingga baris
+                kontribusi fitur juga dilayani tabel
+            batch_size (int): Jumlah baris per panggilan predict
+
+        Returns:
+            PredictionGrid: Tabel prediksi
+        """
+        axes = axes or DEFAULT_AXES
+        for name, points in axes.items():
+            if name not in pipeline.feature_names:
+                raise ValueError(f"Fitur grid tidak dikenal: {name}")
+            if len(points) < 2 or np.any(np.diff(points) <= 0):
+                raise ValueError(f"Titik grid {name} harus minimal dua dan terurut naik")
+        axes = {
+            name: np.union1d(np.asarray(points, dtype=np.float64),
+                             pipeline.fill_values[pipeline.feature_names.index(name)])
+            for name, points in axes.items()
+        }
+
+        forest = _flat_forest(pipeline.model)
+        if forest is None:
+            values = _predict_lattice(pipeline, axes, batch_size)
+        else:
+            values = _forest_lattice(pipeline, axes, forest)
+        return cls(pipeline.feature_names, pipeline.fill_values, axes, values, pipeline.version)
+
+    @property
+    def size(self):
+        return self.values.size
+
+    def _locate(self, X):
+        """
+        Indeks titik grid setiap baris dan mask baris yang tepat di lattice
+        """
+        inside = np.all(X[:, self._others] == self.base_values[self._others], axis=1)
+        positions = []
+        for index, points in zip(self._indices, self.axes.values()):
+            x = X[:, index]
+            i = np.clip(np.searchsorted(points, x), 0, len(points) - 1)
+            inside &= points[i] == x
+            positions.append(i)
+        return tuple(positions), inside
+
+    def contains(self, X):
+        """
+        Baris yang dapat dilayani dari tabel
+
+        Args:
+            X (numpy.ndarray): Matriks semua fitur
+
+        Returns:
+            numpy.ndarray: Mask boolean; True bila setiap fitur grid tepat sama
+                dengan salah satu titik grid dan fitur lain bernilai sama
+                dengan base_values
+        """
+        return self._locate(X)[1]
+
+    def lookup(self, X):
+        """
+        Prediksi tersimpan untuk titik grid setiap baris
+
+        Args:
+            X (numpy.ndarray): Matriks semua fitur (harus tepat di lattice)
+
+        Returns:
+            numpy.ndarray: Prediksi
+        """
+        positions, inside = self._locate(X)
+        if not inside.all():
+            raise ValueError("Baris berada di luar lattice tabel prediksi")
+        return self.values[positions]
+
+    def predict(self, X, pipeline):
+        """
+        Prediksi dari tabel, dengan fallback ke model di luar grid
+
+        Args:
+            X (array): Matriks semua fitur
+            pipeline (InferencePipeline): Pipeline untuk baris di luar grid
+
+        Returns:
+            tuple: (prediksi, mask baris yang dilayani tabel)
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        positions, inside = self._locate(X)
+        prediction = np.empty(len(X))
+        if inside.any():
+            prediction[inside] = self.values[tuple(i[inside] for i in positions)]
+        if not inside.all():
+            prediction[~inside] = pipeline.predict(X[~inside])
+        return prediction, inside
+
+
+def _flat_forest(model):
+    """
+    Forest datar dari model, atau None bila model bukan forest rata-rata daun
+    """
+    if isinstance(model, FlatForest):
+        return model
+    if isinstance(model, CompactForest):
+        return model.to_flat()
+    if FlatForest.supports(model):
+        return FlatForest.from_estimator(model)
+    return None
+
+
+def _lattice_rows(pipeline, axes):
+    """
+    Matriks semua titik lattice; fitur di luar grid bernilai fill_values
+    """
+    mesh = np.meshgrid(*axes.values(), indexing='ij')
+    rows = np.tile(pipeline.fill_values, (mesh[0].size, 1))
+    for name, coordinates in zip(axes, mesh):
+        rows[:, pipeline.feature_names.index(name)] = coordinates.ravel()
+    return rows, mesh[0].shape
+
+
+def _predict_lattice(pipeline, axes, batch_size):
+    """
+    Memprediksi setiap titik lattice dengan pipeline
+    """
+    rows, shape = _lattice_rows(pipeline, axes)
+    values = np.concatenate([
+        pipeline.predict(rows[start:start + batch_size])
+        for start in range(0, len(rows), batch_size)
+    ])
+    return values.reshape(shape)
+
+
+def _forest_lattice(pipeline, axes, forest):
+    """
+    Mengisi lattice dari kotak daun setiap pohon
+
+    Titik lattice diskalakan dengan transform pipeline dan dibandingkan
+    sebagai float32 seperti saat prediksi. Node yang memisah fitur grid
+    membagi kotak indeks pada posisi ambang; node pada fitur lain mengikuti
+    arah nilai dasar. Nilai daun dijumlah per pohon berurutan lalu dibagi
+    jumlah pohon, sama dengan prediksi forest.
+    """
+    names = list(axes)
+    base = pipeline.transform(pipeline.fill_values.reshape(1, -1))[0]
+    base = base.astype(np.float32).astype(np.float64)
+
+    # Posisi potong setiap node internal pada sumbu grid fiturnya (jumlah
+    # titik yang masuk ke kiri), atau arah tetap untuk fitur di luar grid
+    internal = forest.children_left != TREE_LEAF
+    axis_of_node = np.full(forest.node_count, -1)
+    cut = np.zeros(forest.node_count, dtype=np.int64)
+    for axis, name in enumerate(names):
+        column = pipeline.feature_names.index(name)
+        rows = np.tile(pipeline.fill_values, (len(axes[name]), 1))
+        rows[:, column] = axes[name]
+        scaled = pipeline.transform(rows)[:, column].astype(np.float32).astype(np.float64)
+        nodes = np.flatnonzero(internal & (forest.feature == column))
+        axis_of_node[nodes] = axis
+        cut[nodes] = np.searchsorted(scaled, forest.threshold[nodes], side='right')
+    others = np.flatnonzero(internal & (axis_of_node < 0))
+    go_left = np.zeros(forest.node_count, dtype=bool)
+    go_left[others] = base[forest.feature[others]] <= forest.threshold[others]
+
+    # List Python jauh lebih cepat daripada indeks skalar NumPy di dalam loop
+    left, right = forest.children_left.tolist(), forest.children_right.tolist()
+    axis_of_node, cut = axis_of_node.tolist(), cut.tolist()
+    go_left, leaf_value = go_left.tolist(), forest.value.tolist()
+
+    shape = tuple(len(points) for points in axes.values())
+    values = np.zeros(shape)
+    tree_values = np.empty(shape)
+    for root in forest.roots.tolist():
+        stack = [(root, tuple((0, n) for n in shape))]
+        while stack:
+            node, box = stack.pop()
+            if left[node] == TREE_LEAF:
+                tree_values[tuple(slice(lo, hi) for lo, hi in box)] = leaf_value[node]
+                continue
+            axis = axis_of_node[node]
+            if axis < 0:
+                stack.append((left[node] if go_left[node] else right[node], box))
+                continue
+            lo, hi = box[axis]
+            k = cut[node]
+            if lo < min(k, hi):
+                stack.append((left[node], box[:axis] + ((lo, min(k, hi)),) + box[axis + 1:]))
+            if max(k, lo) < hi:
+                stack.append((right[node], box[:axis] + ((max(k, lo), hi),) + box[axis + 1:]))
+        values += tree_values
+    values /= forest.n_trees
+    return values
@@ -0,0 +1,236 @@
+"""
+Modul Inferensi Ringan Harga Rumah
+
+Jalur prediksi yang hanya bergantung pada NumPy. Pipeline disimpan sebagai
+satu file .npz (statistik imputer/scaler, nama fitur, dan array
+CompactForest) sehingga pemuatan tidak membutuhkan pandas, sklearn, maupun
+joblib. Cocok untuk proses yang hanya perlu memprediksi beberapa baris,
+misalnya aplikasi Streamlit atau skrip CLI, di mana waktu impor
+mendominasi waktu prediksi pertama.
+
+Input dapat berupa dict (nama fitur -> nilai atau daftar nilai), list/array
+berurutan sesuai feature_names, atau DataFrame.
+"""
+
+import os
+
+import numpy as np
+
+from src.flat_forest import CompactForest
+from src.model_registry import ModelRegistry, atomic_write
+
+MODEL_DIR = 'models'
+SLIM_PIPELINE_FILE = 'house_price_pipeline_slim.npz'
+PIPELINE_FILE = 'house_price_pipeline.pkl'
+SLIM_FORMAT_VERSION = 1
+
+# Field CompactForest yang disimpan sebagai array di file .npz
+FOREST_ARRAYS = ('children_left', 'children_right', 'feature', 'threshold', 'value',
+                 'root_codes', 'internal_offsets', 'leaf_offsets')
+
+registry = ModelRegistry(max_versions=2)
+
+
+def as_feature_matrix(X, feature_names):
+    """
+    Mengubah dict, DataFrame, atau array menjadi matriks float64
+
+    Args:
+        X: Dict nama fitur -> nilai (skalar atau daftar), DataFrame dengan
+            kolom fitur, atau array berurutan sesuai feature_names
+        feature_names (list): Urutan nama fitur
+
+    Returns:
+        numpy.ndarray: Matriks fitur 2D
+    """
+    if isinstance(X, dict) or hasattr(X, 'columns'):
+        available = X.keys() if isinstance(X, dict) else X.columns
+        missing = [name for name in feature_names if name not in available]
+        if missing:
+            raise ValueError(f"Kolom fitur tidak ditemukan: {missing}")
+        if isinstance(X, dict):
+            X = np.column_stack([np.atleast_1d(np.asarray(X[name], dtype=np.float64))
+                                 for name in feature_names])
+        else:
+            X = X[feature_names].to_numpy(dtype=np.float64)
+    else:
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+    if X.shape[1] != len(feature_names):
+        raise ValueError(
+            f"Jumlah fitur {X.shape[1]} tidak sesuai, seharusnya {len(feature_names)}"
+        )
+    return X
+
+
+class SlimPipeline:
+    def __init__(self, feature_names, fill_values, mean, scale, forest, version=None):
+        """
+        Inisialisasi pipeline inferensi ringan
+
+        Args:
+            feature_names (list): Urutan nama fitur input
+            fill_values (array): Nilai pengganti missing value per fitur
+            mean (array): Rata-rata fitur untuk standardisasi
+            scale (array): Simpangan baku fitur untuk standardisasi
+            forest (CompactForest): Forest ringkas terlatih
+            version (str): Versi artefak asal
+        """
+        self.feature_names = list(feature_names)
+        self.fill_values = np.asarray(fill_values, dtype=np.float64)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.model = forest
+        self.version = version
+        self._fill_scaled = (self.fill_values - self.mean) / self.scale
+
+    @property
+    def input_columns(self):
+        return self.feature_names
+
+    def to_array(self, X):
+        """
+        Mengubah input menjadi matriks float64 (lihat as_feature_matrix)
+        """
+        return as_feature_matrix(X, self.feature_names)
+
+    def transform(self, X):
+        """
+        Imputasi dan standardisasi dalam satu langkah vektor
+
+        Args:
+            X: Data fitur mentah
+
+        Returns:
+            numpy.ndarray: Fitur terstandardisasi
+        """
+        X = self.to_array(X)
+        return np.where(np.isnan(X), self._fill_scaled, (X - self.mean) / self.scale)
+
+    def predict(self, X):
+        """
+        Memprediksi harga rumah
+
+        Args:
+            X: Data fitur mentah
+
+        Returns:
+            numpy.ndarray: Prediksi harga
+        """
+        return self.model.predict(self.transform(X))
+
+    def save(self, filepath):
+        """
+        Menyimpan pipeline sebagai satu file .npz tanpa pickle
+
+        Args:
+            filepath (str): Path penyimpanan
+        """
+        arrays = {f'forest_{name}': getattr(self.model, name) for name in FOREST_ARRAYS}
+        with atomic_write(filepath) as tmp_path, open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                format_version=SLIM_FORMAT_VERSION,
+                feature_names=np.array(self.feature_names, dtype=str),
+                fill_values=self.fill_values,
+                mean=self.mean,
+                scale=self.scale,
+                version=np.array(self.version or '', dtype=str),
+                n_features=self.model.n_features,
+                **arrays
+            )
+        print(f"Pipeline ringan versi {self.version} disimpan di {filepath}")
+
+    @classmethod
+    def load(cls, filepath):
+        """
+        Memuat pipeline dari file .npz
+
+        Args:
+            filepath (str): Path artefak
+
+        Returns:
+            SlimPipeline: Pipeline yang dimuat
+        """
+        with np.load(filepath, allow_pickle=False) as data:
+            if int(data['format_version']) != SLIM_FORMAT_VERSION:
+                raise ValueError(f"Format pipeline ringan tidak didukung: {data['format_version']}")
+            forest = CompactForest(
+                n_features=int(data['n_features']),
+                **{name: data[f'forest_{name}'] for name in FOREST_ARRAYS}
+            )
+            return cls(data['feature_names'].tolist(), data['fill_values'], data['mean'],
+                       data['scale'], forest, str(data['version']) or None)
+
+    @classmethod
+    def from_pipeline(cls, pipeline, forest):
+        """
+        Membuat pipeline ringan dari InferencePipeline dan forest ringkasnya
+
+        Args:
+            pipeline (InferencePipeline): Pipeline terlatih dengan fitur numerik
+                (tanpa feature_engineer)
+            forest (CompactForest): Hasil ModelTrainer.export_compact
+
+        Returns:
+            SlimPipeline: Pipeline ringan
+        """
+        if getattr(pipeline, 'feature_engineer', None) is not None:
+            raise ValueError("Pipeline dengan feature_engineer membutuhkan pandas")
+        return cls(pipeline.feature_names, pipeline.fill_values, pipeline.mean,
+                   pipeline.scale, forest, pipeline.version)
+
+
+def slim_pipeline_path(model_dir=MODEL_DIR):
+    """
+    Path artefak ringan bila ada dan tidak lebih lama dari pipeline utama
+
+    Args:
+        model_dir (str): Direktori model
+
+    Returns:
+        str: Path artefak, atau None
+    """
+    slim_path = os.path.join(model_dir, SLIM_PIPELINE_FILE)
+    pipeline_path = os.path.join(model_dir, PIPELINE_FILE)
+    if not os.path.exists(slim_path):
+        return None
+    if os.path.exists(pipeline_path) and os.path.getmtime(slim_path) < os.path.getmtime(pipeline_path):
+        return None
+    return slim_path
+
+
+def load_slim_pipeline(model_dir=MODEL_DIR, use_cache=True):
+    """
+    Memuat pipeline ringan, dipakai ulang selama file tidak berubah
+
+    Args:
+        model_dir (str): Direktori model
+        use_cache (bool): Pakai salinan di memori proses
+
+    Returns:
+        SlimPipeline: Pipeline ringan
+    """
+    path = slim_pipeline_path(model_dir)
+    if path is None:
+        raise FileNotFoundError(f"Pipeline ringan tidak ditemukan di {model_dir}; "
+                                "jalankan train_model.py dengan model random_forest")
+    if not use_cache:
+        return SlimPipeline.load(path)
+    return registry.get(f'{model_dir}:slim', (path,), lambda: SlimPipeline.load(path))
+
+
+def predict(X, model_dir=MODEL_DIR):
+    """
+    Prediksi harga dengan pipeline ringan
+
+    Args:
+        X: Dict, list/array, atau DataFrame fitur
+        model_dir (str): Direktori model
+
+    Returns:
+        numpy.ndarray: Prediksi harga
+    """
+    return load_slim_pipeline(model_dir).predict(X)
@@ -0,0 +1,297 @@
+"""
+Modul Pelatihan Out-of-Core Harga Rumah
+
+Melatih model dari CSV yang lebih besar dari RAM dengan membaca data per
+chunk sehingga puncak memori dibatasi ukuran chunk, bukan ukuran dataset.
+
+Tahapan:
+1. Satu pass statistik: median imputer didekati dengan QuantileSketch,
+   rata-rata/varians scaler dengan StandardScaler.partial_fit
+2. Pass pelatihan: model dengan partial_fit dilatih per chunk selama
+   beberapa epoch, lalu dievaluasi secara streaming pada baris testing
+
+Pembagian train/test memakai hash per baris (ads_id bila ada) sehingga
+deterministik dan tidak membutuhkan indeks acak seukuran dataset.
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from src.inference import InferencePipeline
+from src.model_training import ModelTrainer
+
+
+class QuantileSketch:
+    def __init__(self, capacity=2000):
+        """
+        Sketsa kuantil berbobot dengan memori tetap
+
+        Nilai disimpan terurut beserta bobotnya; ketika melebihi kapasitas,
+        nilai-nilai bertetangga digabung menjadi centroid berbobot sama.
+        Galat kuantil sekitar 1/capacity dalam peringkat.
+
+        Args:
+            capacity (int): Jumlah centroid maksimum
+        """
+        self.capacity = capacity
+        self.values = np.empty(0)
+        self.weights = np.empty(0)
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def update(self, values):
+        """
+        Menambahkan batch nilai (NaN diabaikan)
+
+        Args:
+            values (array): Nilai baru
+
+        Returns:
+            QuantileSketch: Objek ini
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+
+        merged = np.concatenate([self.values, values])
+        weights = np.concatenate([self.weights, np.ones(values.size)])
+        order = np.argsort(merged, kind='stable')
+        self.values, self.weights = merged[order], weights[order]
+        if self.values.size > self.capacity:
+            self._compress()
+        return self
+
+    def _compress(self):
+        """
+        Menggabungkan nilai menjadi `capacity` centroid dengan bobot setara
+        """
+        cumulative = np.cumsum(self.weights)
+        bucket = np.minimum(
+            ((cumulative - self.weights / 2) / cumulative[-1] * self.capacity).astype(np.int64),
+            self.capacity - 1
+        )
+        weights = np.bincount(bucket, weights=self.weights, minlength=self.capacity)
+        sums = np.bincount(bucket, weights=self.values * self.weights, minlength=self.capacity)
+        keep = weights > 0
+        self.values = sums[keep] / weights[keep]
+        self.weights = weights[keep]
+
+    def quantile(self, q):
+        """
+        Perkiraan kuantil
+
+        Args:
+            q (float): Kuantil antara 0 dan 1
+
+        Returns:
+            float: Nilai kuantil; NaN bila belum ada data
+        """
+        if self.values.size == 0:
+            return np.nan
+        # Posisi tengah setiap centroid pada distribusi kumulatif
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return float(np.interp(q * self.count, centers, self.values))
+
+
+def hash_split(chunk, test_fraction=0.2, key_columns=None, seed=42):
+    """
+    Menentukan baris testing dari hash isi baris
+
+    Args:
+        chunk (pandas.DataFrame): Chunk data
+        test_fraction (float): Proporsi baris testing
+        key_columns (list): Kolom penentu hash; default ads_id bila ada,
+            selain itu seluruh kolom
+        seed (int): Kunci hash
+
+    Returns:
+        numpy.ndarray: Mask boolean baris testing
+    """
+    if key_columns is None:
+        key_columns = ['ads_id'] if 'ads_id' in chunk.columns else list(chunk.columns)
+    hashes = pd.util.hash_pandas_object(
+        chunk[key_columns], index=False, hash_key=f'{seed:016d}'
+    ).to_numpy()
+    return (hashes % 10_000) < test_fraction * 10_000
+
+
+class StreamingTrainer:
+    def __init__(self, features, target='price_in_rp', model_type='sgd', chunksize=100_000,
+                 test_fraction=0.2, n_epochs=3, sketch_capacity=2000, model_params=None,
+                 quality_filter=None):
+        """
+        Inisialisasi pelatihan out-of-core
+
+        Args:
+            features (list): Kolom fitur numerik
+            target (str): Kolom target
+            model_type (str): Jenis model ModelTrainer yang mendukung partial_fit
+            chunksize (int): Jumlah baris per chunk
+            test_fraction (float): Proporsi baris testing (hash split)
+            n_epochs (int): Jumlah pass pelatihan
+            sketch_capacity (int): Kapasitas QuantileSketch per fitur
+            model_params (dict): Hyperparameter model (opsional)
+            quality_filter (DataQualityFilter): Filter baris training (opsional);
+                baris testing tidak disaring agar evaluasi tetap pada data mentah
+        """
+        self.features = list(features)
+        self.target = target
+        self.trainer = ModelTrainer(model_type, model_params)
+        if not hasattr(self.trainer.model, 'partial_fit'):
+            raise ValueError(f"Model {model_type} tidak mendukung partial_fit")
+        self.chunksize = chunksize
+        self.test_fraction = test_fraction
+        self.n_epochs = n_epochs
+        self.sketches = [QuantileSketch(sketch_capacity) for _ in self.features]
+        self.scaler = StandardScaler()
+        self.fill_values = None
+        self.mean = None
+        self.scale = None
+        self.n_train = 0
+        self.quality_filter = quality_filter
+
+    def _read(self, filepath):
+        """
+        Membaca CSV per chunk; hanya kolom yang dibutuhkan yang di-parse
+        """
+        header = pd.read_csv(filepath, nrows=0).columns
+        usecols = self.features + [self.target] + (['ads_id'] if 'ads_id' in header else [])
+        for chunk in pd.read_csv(filepath, usecols=usecols, chunksize=self.chunksize):
+            yield chunk, hash_split(chunk, self.test_fraction)
+
+    def _chunks(self, filepath):
+        """
+        Chunk sebagai (X, y, mask baris testing), setelah filter kualitas data
+        """
+        if self.quality_filter is not None:
+            if self.quality_filter.bounds_ is None:
+                self.quality_filter.fit(chunk[~is_test] for chunk, is_test in self._read(filepath))
+            self.quality_filter.start_pass()
+
+        for chunk, is_test in self._read(filepath):
+            keep = chunk[self.target].notna().to_numpy(copy=True)
+            if self.quality_filter is not None:
+                keep[~is_test] &= self.quality_filter.mask(chunk[~is_test])
+            chunk, is_test = chunk[keep], is_test[keep]
+
+            X = chunk[self.features].apply(pd.to_numeric, errors='coerce').to_numpy(np.float64)
+            y = chunk[self.target].to_numpy(np.float64)
+            yield X, y, is_test
+
+    def fit_statistics(self, filepath):
+        """
+        Satu pass untuk median imputer dan rata-rata/varians scaler
+
+        StandardScaler.partial_fit mengabaikan NaN, sehingga statistiknya
+        dihitung dari nilai teramati; setelah median diketahui, nilai yang
+        hilang (yang nanti diisi median) digabungkan secara eksak.
+
+        Args:
+            filepath (str): Path CSV
+
+        Returns:
+            StreamingTrainer: Objek ini
+        """
+        n_rows = 0
+        for X, _, is_test in self._chunks(filepath):
+            X_train = X[~is_test]
+            if len(X_train) == 0:
+                continue
+            n_rows += len(X_train)
+            self.scaler.partial_fit(X_train)
+            for sketch, column in zip(self.sketches, X_train.T):
+                sketch.update(column)
+
+        if n_rows == 0:
+            raise ValueError("Tidak ada baris training di dataset")
+
+        median = np.array([sketch.quantile(0.5) for sketch in self.sketches])
+        # Fitur tanpa satu pun nilai teramati diisi 0
+        self.fill_values = np.where(np.isnan(median), 0.0, median)
+
+        n_observed = np.broadcast_to(self.scaler.n_samples_seen_, median.shape).astype(np.float64)
+        observed_mean = np.nan_to_num(self.scaler.mean_)
+        observed_var = np.nan_to_num(self.scaler.var_)
+        n_missing = n_rows - n_observed
+        mean = (n_observed * observed_mean + n_missing * self.fill_values) / n_rows
+        var = (
+            n_observed * (observed_var + (observed_mean - mean) ** 2)
+            + n_missing * (self.fill_values - mean) ** 2
+        ) / n_rows
+
+        self.mean = mean
+        self.scale = np.where(var > 0, np.sqrt(var), 1.0)
+        self.n_train = n_rows
+        return self
+
+    def _transform(self, X):
+        return np.where(np.isnan(X), (self.fill_values - self.mean) / self.scale,
+                        (X - self.mean) / self.scale)
+
+    def fit(self, filepath):
+        """
+        Menghitung statistik lalu melatih model per chunk
+
+        Args:
+            filepath (str): Path CSV
+
+        Returns:
+            StreamingTrainer: Objek ini
+        """
+        if self.fill_values is None:
+            self.fit_statistics(filepath)
+
+        for _ in range(self.n_epochs):
+            for X, y, is_test in self._chunks(filepath):
+                if (~is_test).any():
+                    self.trainer.update_model(self._transform(X[~is_test]), y[~is_test])
+        return self
+
+    def evaluate(self, filepath):
+        """
+        Evaluasi streaming pada baris testing
+
+        Args:
+            filepath (str): Path CSV
+
+        Returns:
+            dict: MAE, MSE, R², dan jumlah baris testing
+        """
+        n = abs_error = sq_error = y_sum = y_sq_sum = 0.0
+        for X, y, is_test in self._chunks(filepath):
+            if not is_test.any():
+                continue
+            y_test = y[is_test]
+            error = self.trainer.model.predict(self._transform(X[is_test])) - y_test
+            n += len(y_test)
+            abs_error += np.abs(error).sum()
+            sq_error += (error ** 2).sum()
+            y_sum += y_test.sum()
+            y_sq_sum += (y_test ** 2).sum()
+
+        if n == 0:
+            raise ValueError("Tidak ada baris testing di dataset")
+        total = y_sq_sum - y_sum ** 2 / n
+        return {
+            'mae': abs_error / n,
+            'mse': sq_error / n,
+            'r2': 1 - sq_error / total if total > 0 else np.nan,
+            'n_test': int(n)
+        }
+
+    def to_pipeline(self, version=None):
+        """
+        Membentuk InferencePipeline dari statistik dan model terlatih
+
+        Args:
+            version (str): Versi artefak
+
+        Returns:
+            InferencePipeline: Pipeline inferensi
+        """
+        return InferencePipeline(self.features, self.fill_values, self.mean, self.scale,
+                                 self.trainer.model, version, n_samples=self.n_train)
@@ -2,59 +2,396 @@ import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestRegressor
 from sklearn.impute import SimpleImputer  # Tambahkan imputer
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+import argparse
 import joblib
+import json
 import os
+import re
+import time
+from prediction import SHARD_DIR, SHARD_INDEX_FILE, load_shard_router, shard_key
+from src.data_quality import DataQualityFilter
+from src.dataset_cache import load_dataset
+from src.feature_engineering import FeatureEngineer
+from src.flat_forest import FlatForest
+from src.inference import InferencePipeline
+from src.model_registry import atomic_write
+from src.model_training import ModelTrainer
+from src.model_tuning import LATENCY_CANDIDATES, ModelTuner, select_fastest_model
+from src.slim_inference import SlimPipeline
+from src.streaming_training import StreamingTrainer
 
-# Pastikan direktori models ada
-if not os.path.exists('models'):
-    os.makedirs('models')
+DATA_PATH = os.path.join('app', 'jabodetabek_house_price.csv')
+MODEL_PATH = 'models/house_price_model.pkl'
+SCALER_PATH = 'models/scaler.pkl'
+IMPUTER_PATH = 'models/imputer.pkl'
+PIPELINE_PATH = 'models/house_price_pipeline.pkl'
+FLAT_PIPELINE_PATH = 'models/house_price_pipeline_flat.pkl'
+SLIM_PIPELINE_PATH = 'models/house_price_pipeline_slim.npz'
+TRAINING_LOG = 'models/training_log.jsonl'
+LEADERBOARD_PATH = 'models/leaderboard.csv'
+FEATURES = ['land_size_m2', 'building_size_m2', 'bedrooms']
+TARGET = 'price_in_rp'
 
-# Baca dataset
-df = pd.read_csv('data\jabodetabek_house_price.csv')  # Sesuaikan nama file dataset Anda
+# Fitur terstandardisasi SGD dibatasi ±2 SD: luas tanah/bangunan ekstrem (hingga
+# ~27 SD) membuat prediksi log-linear meledak setelah expm1
+STREAMING_MODEL_PARAMS = {'sgd': {'feature_clip': 2.0}}
+# Kota dengan baris training lebih sedikit memakai pipeline global
+MIN_SHARD_ROWS = 100
 
-# Cetak informasi dataset untuk debugging
-print("Informasi Dataset:")
-print(df.info())
-print("\nCek Nilai NaN:")
-print(df.isnull().sum())
+def parse_args(argv=None):
+    """Argumen command line"""
+    parser = argparse.ArgumentParser(description="Latih model prediksi harga rumah")
+    parser.add_argument('--data', default=DATA_PATH, help="Path dataset CSV")
+    parser.add_argument('--features', choices=['basic', 'extended'], default='basic',
+                        help="basic: luas tanah, luas bangunan, kamar; "
+                             "extended: seluruh fitur dari FeatureEngineer")
+    parser.add_argument('--model',
+                        help="Jenis model ModelTrainer (random_forest, sgd, ...); "
+                             "default random_forest, atau sgd pada mode --out-of-core")
+    parser.add_argument('--incremental', metavar='CSV',
+                        help="Perbarui pipeline yang ada dengan baris baru dari CSV ini")
+    parser.add_argument('--new-trees', type=int, default=10,
+                        help="Jumlah pohon yang ditambahkan pada mode inkremental")
+    parser.add_argument('--tune', action='store_true',
+                        help="Tuning hyperparameter semua model dan tampilkan leaderboard")
+    parser.add_argument('--select-fastest', action='store_true',
+                        help="Pilih model dengan latensi p95 terendah yang memenuhi target R²")
+    parser.add_argument('--target-r2', type=float,
+                        help="Target R² validasi untuk --select-fastest "
+                             "(default: R² terbaik dikurangi 0.02)")
+    parser.add_argument('--out-of-core', action='store_true',
+                        help="Latih per chunk tanpa memuat seluruh dataset ke memori "
+                             "(model harus mendukung partial_fit)")
+    parser.add_argument('--chunksize', type=int, default=100_000,
+                        help="Jumlah baris per chunk pada mode --out-of-core")
+    parser.add_argument('--epochs', type=int, default=3,
+                        help="Jumlah pass pelatihan pada mode --out-of-core")
+    parser.add_argument('--clean', action='store_true',
+                        help="Saring baris training yang tidak valid, duplikat ads_id, "
+                             "dan outlier harga per m² sebelum training")
+    parser.add_argument('--outlier-method', choices=['mad', 'iqr'], default='mad',
+                        help="Metode outlier harga per m² untuk --clean")
+    parser.add_argument('--shard-by', choices=['city', 'district'],
+                        help="Latih satu model per kota/kecamatan secara paralel; "
+                             "pipeline global tetap menjadi cadangan")
+    parser.add_argument('--shards',
+                        help="Daftar shard (dipisah koma) yang dilatih ulang; "
+                             "shard lain tidak diubah")
+    parser.add_argument('--jobs', type=int,
+                        help="Jumlah proses untuk --shard-by (default jumlah CPU)")
+    args = parser.parse_args(argv)
+    if args.model is None:
+        args.model = 'sgd' if args.out_of_core else 'random_forest'
+    return args
 
-# Pisahkan fitur dan target
-X = df[['land_size_m2', 'building_size_m2', 'bedrooms']]
-y = df['price_in_rp']
+def log_training(entry):
+    """Mencatat waktu pelatihan ke log JSON Lines"""
+    with open(TRAINING_LOG, 'a') as f:
+        f.write(json.dumps(entry) + '\n')
 
-# Tangani nilai NaN menggunakan SimpleImputer
-imputer = SimpleImputer(strategy='median')
-X_imputed = imputer.fit_transform(X)
+def save_pipeline(pipeline, trainer, X_verify):
+    """Simpan pipeline, plus versi forest ringkas (memory-map) dan ringan (NumPy saja)"""
+    pipeline.save(PIPELINE_PATH)
+    if FlatForest.supports(pipeline.model):
+        # Ekspor ringkas diverifikasi terhadap prediksi sklearn sebelum disimpan
+        compact = trainer.export_compact(X_verify)
+        flat_bytes = FlatForest.from_estimator(pipeline.model).nbytes
+        print(f"Forest ringkas: {compact.nbytes / 1e6:.1f} MB "
+              f"(format datar {flat_bytes / 1e6:.1f} MB)")
+        pipeline.to_flat(compact).save(FLAT_PIPELINE_PATH)
+        if pipeline.feature_engineer is None:
+            SlimPipeline.from_pipeline(pipeline, compact).save(SLIM_PIPELINE_PATH)
+        elif os.path.exists(SLIM_PIPELINE_PATH):
+            os.remove(SLIM_PIPELINE_PATH)
+    else:
+        # Hapus versi datar/ringan lama agar serving tidak memakai model usang
+        for path in (FLAT_PIPELINE_PATH, SLIM_PIPELINE_PATH):
+            if os.path.exists(path):
+                os.remove(path)
 
-# Split data
-X_train, X_test, y_train, y_test = train_test_split(X_imputed, y, test_size=0.2, random_state=42)
+def save_legacy_artifacts(model, scaler, imputer):
+    """Simpan model, scaler, dan imputer terpisah (dipakai prediction.load_model)"""
+    for artifact, path in ((model, MODEL_PATH), (scaler, SCALER_PATH), (imputer, IMPUTER_PATH)):
+        with atomic_write(path) as tmp_path:
+            joblib.dump(artifact, tmp_path)
 
-# Inisiasi Scaler
-scaler = StandardScaler()
-X_train_scaled = scaler.fit_transform(X_train)
-X_test_scaled = scaler.transform(X_test)
+def update_legacy_artifacts(pipeline):
+    """Samakan artefak terpisah dengan pipeline hasil pelatihan inkremental/out-of-core"""
+    if not all(os.path.exists(path) for path in (MODEL_PATH, SCALER_PATH, IMPUTER_PATH)):
+        return
 
-# Buat dan latih model
-model = RandomForestRegressor(n_estimators=100, random_state=42)
-model.fit(X_train_scaled, y_train)
+    scaler, imputer = joblib.load(SCALER_PATH), joblib.load(IMPUTER_PATH)
+    if imputer.statistics_.shape != pipeline.fill_values.shape:
+        # Artefak terpisah berasal dari model lain (misalnya sebelum pelatihan
+        # out-of-core); hapus daripada membiarkan load_model memakai model usang
+        for path in (MODEL_PATH, SCALER_PATH, IMPUTER_PATH):
+            os.remove(path)
+        return
 
-# Simpan model, scaler, dan imputer
-joblib.dump(model, 'models/house_price_model.pkl')
-joblib.dump(scaler, 'models/scaler.pkl')
-joblib.dump(imputer, 'models/imputer.pkl')
+    imputer.statistics_ = pipeline.fill_values.copy()
+    scaler.mean_ = pipeline.mean.copy()
+    scaler.scale_ = pipeline.scale.copy()
+    scaler.var_ = pipeline.scale ** 2
+    if pipeline.n_samples is not None:
+        scaler.n_samples_seen_ = pipeline.n_samples
+    save_legacy_artifacts(pipeline.model, scaler, imputer)
 
-print("Model, Scaler, dan Imputer berhasil disimpan!")
+def print_quality_report(quality_filter):
+    """Mencetak laporan penolakan filter kualitas data"""
+    print("\nLaporan Kualitas Data (training):")
+    print(quality_filter.report().to_string(index=False))
 
-# Evaluasi model (opsional)
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+def last_full_training():
+    """Entri pelatihan penuh terakhir dari log"""
+    if not os.path.exists(TRAINING_LOG):
+        return None
+
+    with open(TRAINING_LOG) as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    full = [entry for entry in entries if entry['mode'] == 'full']
+    return full[-1] if full else None
+
+def train_incremental(args):
+    """Perbarui pipeline tersimpan dengan batch listing baru"""
+    pipeline = InferencePipeline.load(PIPELINE_PATH)
+    df_new = pd.read_csv(args.incremental)
+    y_new = df_new[TARGET]
+    X_new = df_new if pipeline.feature_engineer is not None else df_new[pipeline.feature_names]
+
+    start = time.perf_counter()
+
+    trainer = ModelTrainer.from_model(pipeline.model)
+
+    # Statistik imputer/scaler hanya diperbarui untuk model yang belajar online;
+    # ambang pohon pada model ensemble terikat pada skala lama
+    if hasattr(pipeline.model, 'partial_fit'):
+        pipeline.update_statistics(X_new)
+
+    trainer.update_model(pipeline.transform(X_new), y_new, args.new_trees)
+    pipeline.set_model(trainer.model)
+    elapsed = time.perf_counter() - start
+
+    save_pipeline(pipeline, trainer, pipeline.transform(X_new))
+    update_legacy_artifacts(pipeline)
+
+    print(f"Pelatihan inkremental {len(df_new)} baris selesai dalam {elapsed:.2f} detik")
+    full = last_full_training()
+    if full is not None:
+        print(f"Pelatihan penuh terakhir: {full['seconds']:.2f} detik "
+              f"(hemat {full['seconds'] - elapsed:.2f} detik)")
+
+    log_training({'mode': 'incremental', 'version': pipeline.version,
+                  'rows': len(df_new), 'seconds': elapsed})
+
+def train_out_of_core(args):
+    """Latih model per chunk dari CSV yang lebih besar dari RAM"""
+    os.makedirs('models', exist_ok=True)
+
+    start = time.perf_counter()
+    quality_filter = DataQualityFilter(args.outlier_method) if args.clean else None
+    trainer = StreamingTrainer(FEATURES, TARGET, args.model, args.chunksize,
+                               n_epochs=args.epochs,
+                               model_params=STREAMING_MODEL_PARAMS.get(args.model),
+                               quality_filter=quality_filter)
+    trainer.fit(args.data)
+    elapsed = time.perf_counter() - start
+    if quality_filter is not None:
+        print_quality_report(quality_filter)
+
+    pipeline = trainer.to_pipeline()
+    save_pipeline(pipeline, trainer.trainer, None)
+    update_legacy_artifacts(pipeline)
+    log_training({'mode': 'streaming', 'version': pipeline.version,
+                  'rows': trainer.n_train, 'seconds': elapsed})
+
+    metrics = trainer.evaluate(args.data)
+    print(f"Pelatihan out-of-core {trainer.n_train} baris selesai dalam {elapsed:.2f} detik")
+    print(f"Mean Absolute Error: {metrics['mae']}")
+    print(f"Mean Squared Error: {metrics['mse']}")
+    print(f"R-squared: {metrics['r2']}")
+
+def train_sharded(args):
+    """Latih model per kota (atau kecamatan) secara paralel, satu artefak per shard"""
+    shard_dir = os.path.join('models', SHARD_DIR)
+    index_path = os.path.join(shard_dir, SHARD_INDEX_FILE)
+    os.makedirs(shard_dir, exist_ok=True)
+
+    columns = FEATURES + [TARGET, args.shard_by] + (['ads_id'] if args.clean else [])
+    df = load_dataset(args.data, columns=columns)
+    df_train, df_test = train_test_split(df, test_size=0.2, random_state=42)
+    if args.clean:
+        quality_filter = DataQualityFilter(args.outlier_method)
+        df_train = quality_filter.fit_transform(df_train)
+        print_quality_report(quality_filter)
+
+    keys = shard_key(df_train[args.shard_by]).fillna('').to_numpy(dtype=object)
+    selected = None
+    if args.shards:
+        selected = set(shard_key(args.shards.split(',')))
+
+    index = {'column': args.shard_by, 'shards': {}}
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            previous = json.load(f)
+        if previous['column'] == args.shard_by and selected is not None:
+            index = previous
+
+    # Imputer dan scaler dihitung per shard sehingga setiap shard berdiri sendiri
+    data, statistics = {}, {}
+    for key in pd.unique(keys[keys != '']):
+        rows = keys == key
+        if rows.sum() < MIN_SHARD_ROWS or (selected is not None and key not in selected):
+            continue
+        X = df_train.loc[rows, FEATURES].astype('float64')
+        imputer = SimpleImputer(strategy='median').fit(X)
+        scaler = StandardScaler().fit(imputer.transform(X))
+        data[key] = (scaler.transform(imputer.transform(X)), df_train.loc[rows, TARGET])
+        statistics[key] = (imputer, scaler)
+
+    start = time.perf_counter()
+    models = ModelTrainer(args.model).train_sharded(data, args.jobs)
+    elapsed = time.perf_counter() - start
+
+    for key, model in models.items():
+        imputer, scaler = statistics[key]
+        pipeline = InferencePipeline.from_components(imputer, scaler, model)
+        filename = re.sub(r'[^a-z0-9]+', '_', key).strip('_') + '.pkl'
+        pipeline.save(os.path.join(shard_dir, filename))
+        index['shards'][key] = filename
+        if FlatForest.supports(model):
+            nodes = sum(est.tree_.node_count for est in model.estimators_)
+            print(f"  {key}: {len(data[key][1])} baris, {nodes} node")
+
+    with atomic_write(index_path) as tmp_path, open(tmp_path, 'w') as f:
+        json.dump(index, f, indent=2)
+    print(f"{len(models)} model shard dilatih dalam {elapsed:.2f} detik -> {index_path}")
+    log_training({'mode': 'sharded', 'shard_by': args.shard_by, 'shards': sorted(models),
+                  'rows': sum(len(y) for _, y in data.values()), 'seconds': elapsed})
+
+    # Evaluasi semua shard di indeks; kota tanpa shard memakai pipeline global
+    router = load_shard_router('models', use_cache=False)
+    if router.fallback is None:
+        df_test = df_test[shard_key(df_test[args.shard_by]).isin(list(router.shards)).to_numpy()]
+    y_test = df_test[TARGET]
+    y_pred = router.predict(df_test)
+    print(f"Mean Absolute Error: {mean_absolute_error(y_test, y_pred)}")
+    print(f"Mean Squared Error: {mean_squared_error(y_test, y_pred)}")
+    print(f"R-squared: {r2_score(y_test, y_pred)}")
+    if router.fallback is not None:
+        print(f"R-squared pipeline global: {r2_score(y_test, router.fallback.predict(df_test))}")
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.incremental:
+        train_incremental(args)
+        return
+
+    if args.out_of_core:
+        train_out_of_core(args)
+        return
+
+    if args.shard_by:
+        train_sharded(args)
+        return
+
+    # Pastikan direktori models ada
+    if not os.path.exists('models'):
+        os.makedirs('models')
+
+    # Baca dataset
+    # Dibaca dari cache kolumnar; hanya kolom yang dipakai yang dimuat
+    columns = FEATURES + [TARGET] if args.features == 'basic' else None
+    if columns and args.clean:
+        columns.append('ads_id')
+    df = load_dataset(args.data, columns=columns)  # Sesuaikan nama file dataset Anda
+
+    # Cetak informasi dataset untuk debugging
+    print("Informasi Dataset:")
+    print(df.info())
+    print("\nCek Nilai NaN:")
+    print(df.isnull().sum())
+
+    # Split data mentah terlebih dahulu agar state fitur hanya dipelajari dari data training
+    df_train, df_test = train_test_split(df, test_size=0.2, random_state=42)
+    if args.clean:
+        # Hanya data training yang disaring; evaluasi tetap pada data testing mentah
+        quality_filter = DataQualityFilter(args.outlier_method)
+        df_train = quality_filter.fit_transform(df_train)
+        print_quality_report(quality_filter)
+    y_train = df_train[TARGET]
+    y_test = df_test[TARGET]
+
+    # Pisahkan fitur dan target
+    feature_engineer = None
+    if args.features == 'extended':
+        feature_engineer = FeatureEngineer()
+        X_train = feature_engineer.fit_transform(df_train, y_train)
+        X_test = feature_engineer.transform(df_test)
+    else:
+        X_train = df_train[FEATURES].astype('float64')
+        X_test = df_test[FEATURES].astype('float64')
+
+    start = time.perf_counter()
+
+    # Tangani nilai NaN menggunakan SimpleImputer
+    imputer = SimpleImputer(strategy='median')
+    X_train_imputed = imputer.fit_transform(X_train)
+    X_test_imputed = imputer.transform(X_test)
+
+    # Inisiasi Scaler
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train_imputed)
+    X_test_scaled = scaler.transform(X_test_imputed)
+
+    if args.tune:
+        leaderboard = ModelTuner().run(X_train_scaled, y_train)
+        print(leaderboard.to_string())
+        leaderboard.to_csv(LEADERBOARD_PATH, index=False)
+        print(f"Leaderboard disimpan di {LEADERBOARD_PATH}")
+        return
+
+    # Buat dan latih model
+    model_type, model_params = args.model, None
+    if args.select_fastest:
+        # Seleksi memakai potongan validasi dari data training, bukan data testing
+        X_fit, X_val, y_fit, y_val = train_test_split(
+            X_train_scaled, y_train, test_size=0.2, random_state=42
+        )
+        best, report = select_fastest_model(X_fit, y_fit, X_val, y_val, target_r2=args.target_r2)
+        print(report.to_string())
+        print(f"Model terpilih: {best}")
+        model_type, model_params = LATENCY_CANDIDATES[best]
+
+    trainer = ModelTrainer(model_type, model_params)
+    trainer.train_model(X_train_scaled, y_train)
+    model = trainer.model
+    elapsed = time.perf_counter() - start
+
+    # Simpan model, scaler, dan imputer
+    save_legacy_artifacts(model, scaler, imputer)
+
+    print("Model, Scaler, dan Imputer berhasil disimpan!")
+
+    # Simpan juga sebagai satu artefak pipeline berversi untuk inferensi
+    pipeline = InferencePipeline.from_components(
+        imputer, scaler, model, feature_engineer=feature_engineer
+    )
+    save_pipeline(pipeline, trainer, X_test_scaled)
+    log_training({'mode': 'full', 'version': pipeline.version,
+                  'rows': len(X_train), 'seconds': elapsed})
+
+    # Evaluasi model (opsional)
+    y_pred = model.predict(X_test_scaled)
+    mae = mean_absolute_error(y_test, y_pred)
+    mse = mean_squared_error(y_test, y_pred)
+    r2 = r2_score(y_test, y_pred)
 
-y_pred = model.predict(X_test_scaled)
-mae = mean_absolute_error(y_test, y_pred)
-mse = mean_squared_error(y_test, y_pred)
-r2 = r2_score(y_test, y_pred)
+    print(f"Mean Absolute Error: {mae}")
+    print(f"Mean Squared Error: {mse}")
+    print(f"R-squared: {r2}")
 
-print(f"Mean Absolute Error: {mae}")
-print(f"Mean Squared Error: {mse}")
-print(f"R-squared: {r2}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,95 @@
+import os
+
 import streamlit as st
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import plotly.express as px
-import plotly.graph_objs as go
 
-def load_data():
+from src.dataset_cache import load_dataset
+
+DATA_PATH = 'dataset_rumah.csv'
+
+# Di atas batas ini scatter/3D memakai sampel acak dan scatter 2D memakai hexbin
+MAX_PLOT_POINTS = 5000
+# Jumlah baris yang ditampilkan di tab data mentah
+MAX_TABLE_ROWS = 1000
+
+def dataset_key(path=DATA_PATH):
+    """Kunci cache dataset; berubah ketika file diperbarui"""
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+@st.cache_resource(max_entries=2)
+def _load_data(key):
+    """Dataset dimuat sekali per versi file dan dipakai bersama (tanpa disalin)"""
+    return load_dataset(key[0])
+
+def load_data(path=DATA_PATH):
     """Memuat dataset"""
-    df = pd.read_csv('dataset_rumah.csv')
-    return df
+    return _load_data(dataset_key(path))
+
+@st.cache_data(max_entries=2)
+def compute_summary(_df, key):
+    """Statistik deskriptif, info kolom, dan korelasi (dihitung sekali per versi dataset)"""
+    col_info = pd.DataFrame({
+        'Nama Kolom': _df.columns,
+        'Tipe Data': _df.dtypes.astype(str),
+        'Jumlah Non-Null': _df.notna().sum(),
+        'Unique Values': _df.nunique()
+    })
+    return {
+        'describe': _df.describe(),
+        'col_info': col_info,
+        'corr': _df.corr(numeric_only=True)
+    }
+
+@st.cache_data(max_entries=8)
+def sample_rows(_df, key, n=MAX_PLOT_POINTS):
+    """Sampel acak tetap untuk plot titik; seluruh data bila cukup kecil"""
+    if len(_df) <= n:
+        return _df
+    return _df.sample(n, random_state=42)
+
+@st.cache_data(max_entries=8)
+def histogram(_df, key, column, bins=50):
+    """Histogram satu kolom dari seluruh data"""
+    values = _df[column].dropna().to_numpy(dtype=np.float64)
+    return np.histogram(values, bins=bins)
+
+@st.cache_data(max_entries=8)
+def box_stats(_df, key, group, column):
+    """Statistik box plot per kelompok untuk matplotlib bxp (tanpa titik pencilan)"""
+    quantiles = _df.groupby(group, observed=True)[column].quantile([0.25, 0.5, 0.75]).unstack()
+    extremes = _df.groupby(group, observed=True)[column].agg(['min', 'max'])
+    stats = []
+    for label, (q1, median, q3) in quantiles.iterrows():
+        iqr = q3 - q1
+        stats.append({
+            'label': str(label), 'q1': q1, 'med': median, 'q3': q3,
+            'whislo': max(extremes.loc[label, 'min'], q1 - 1.5 * iqr),
+            'whishi': min(extremes.loc[label, 'max'], q3 + 1.5 * iqr)
+        })
+    return stats
 
-def show_dataset_info(df):
+def show_dataset_info(df, key):
     """Menampilkan informasi dataset"""
     st.subheader("📊 Informasi Dataset")
-    
+    summary = compute_summary(df, key)
+
     # Statistik Deskriptif
     st.write("### Statistik Deskriptif")
-    st.dataframe(df.describe())
-    
+    st.dataframe(summary['describe'])
+
     # Informasi Kolom
     st.write("### Informasi Kolom")
-    col_info = pd.DataFrame({
-        'Nama Kolom': df.columns,
-        'Tipe Data': df.dtypes,
-        'Jumlah Non-Null': df.notna().sum(),
-        'Unique Values': [df[col].nunique() for col in df.columns]
-    })
-    st.dataframe(col_info)
+    st.dataframe(summary['col_info'])
 
-def create_visualizations(df):
+def create_visualizations(df, key):
     """Membuat berbagai visualisasi"""
     st.subheader("📈 Visualisasi Data")
-    
+
     # Pilihan Visualisasi
     viz_option = st.selectbox("Pilih Jenis Visualisasi", [
         "Distribusi Harga Rumah",
@@ -40,71 +98,86 @@ def create_visualizations(df):
         "Box Plot Jumlah Kamar",
         "Histogram Luas Bangunan"
     ])
-    
+
     # Matplotlib & Seaborn Visualizations
-    plt.figure(figsize=(10, 6))
-    
+    fig, ax = plt.subplots(figsize=(10, 6))
+
     if viz_option == "Distribusi Harga Rumah":
-        plt.title("Distribusi Harga Rumah")
-        sns.histplot(df['harga'], kde=True)
-        st.pyplot(plt)
-    
+        ax.set_title("Distribusi Harga Rumah")
+        counts, edges = histogram(df, key, 'harga')
+        ax.stairs(counts, edges, fill=True)
+        ax.set_xlabel("Harga")
+        ax.set_ylabel("Frekuensi")
+
     elif viz_option == "Korelasi Antar Fitur":
-        plt.title("Korelasi Antar Fitur")
-        korelasi = df.corr()
-        sns.heatmap(korelasi, annot=True, cmap='coolwarm')
-        st.pyplot(plt)
-    
+        ax.set_title("Korelasi Antar Fitur")
+        korelasi = compute_summary(df, key)['corr']
+        sns.heatmap(korelasi, annot=True, cmap='coolwarm', ax=ax)
+
     elif viz_option == "Scatter Plot Luas Tanah vs Harga":
-        plt.title("Luas Tanah vs Harga Rumah")
-        plt.scatter(df['luas_tanah'], df['harga'])
-        plt.xlabel("Luas Tanah")
-        plt.ylabel("Harga")
-        st.pyplot(plt)
-    
+        ax.set_title("Luas Tanah vs Harga Rumah")
+        if len(df) > MAX_PLOT_POINTS:
+            # Data besar diagregasi ke sel heksagonal, bukan digambar per titik
+            hexbin = ax.hexbin(df['luas_tanah'], df['harga'], gridsize=60, bins='log', mincnt=1)
+            fig.colorbar(hexbin, ax=ax, label="Jumlah rumah (log)")
+        else:
+            ax.scatter(df['luas_tanah'], df['harga'])
+        ax.set_xlabel("Luas Tanah")
+        ax.set_ylabel("Harga")
+
     elif viz_option == "Box Plot Jumlah Kamar":
-        plt.title("Distribusi Harga Berdasarkan Jumlah Kamar")
-        sns.boxplot(x='jumlah_kamar', y='harga', data=df)
-        st.pyplot(plt)
-    
+        ax.set_title("Distribusi Harga Berdasarkan Jumlah Kamar")
+        ax.bxp(box_stats(df, key, 'jumlah_kamar', 'harga'), showfliers=False)
+        ax.set_xlabel("Jumlah Kamar")
+        ax.set_ylabel("Harga")
+
     elif viz_option == "Histogram Luas Bangunan":
-        plt.title("Histogram Luas Bangunan")
-        plt.hist(df['luas_bangunan'], bins=20)
-        plt.xlabel("Luas Bangunan")
-        plt.ylabel("Frekuensi")
-        st.pyplot(plt)
-    
+        ax.set_title("Histogram Luas Bangunan")
+        counts, edges = histogram(df, key, 'luas_bangunan', bins=20)
+        ax.stairs(counts, edges, fill=True)
+        ax.set_xlabel("Luas Bangunan")
+        ax.set_ylabel("Frekuensi")
+
+    st.pyplot(fig)
+    plt.close(fig)
+
     # Plotly Interactive Visualization
     st.subheader("🔍 Visualisasi Interaktif")
-    
+
     # Scatter 3D Interaktif
-    fig = px.scatter_3d(df, x='luas_tanah', y='luas_bangunan', z='harga', 
-                        color='jumlah_kamar', 
+    sample = sample_rows(df, key)
+    fig = px.scatter_3d(sample, x='luas_tanah', y='luas_bangunan', z='harga',
+                        color='jumlah_kamar',
                         title='Hubungan 3D Luas Tanah, Bangunan, dan Harga')
     st.plotly_chart(fig)
+    if len(sample) < len(df):
+        st.caption(f"Menampilkan sampel acak {len(sample):,} dari {len(df):,} rumah")
 
 def main_visualization():
     st.title("🏡 Visualisasi Dataset Rumah")
-    
+
     # Muat Dataset
+    key = dataset_key()
     df = load_data()
-    
+
     # Tab Visualisasi
     tab1, tab2, tab3 = st.tabs([
-        "Informasi Dataset", 
-        "Visualisasi Statis", 
+        "Informasi Dataset",
+        "Visualisasi Statis",
         "Data Mentah"
     ])
-    
+
     with tab1:
-        show_dataset_info(df)
-    
+        show_dataset_info(df, key)
+
     with tab2:
-        create_visualizations(df)
-    
+        create_visualizations(df, key)
+
     with tab3:
         st.subheader("📋 Data Mentah")
-        st.dataframe(df)
+        st.dataframe(df.head(MAX_TABLE_ROWS))
+        if len(df) > MAX_TABLE_ROWS:
+            st.caption(f"Menampilkan {MAX_TABLE_ROWS:,} dari {len(df):,} baris")
 
 if __name__ == "__main__":
-    main_visualization()
\ No newline at end of file
+    main_visualization()